@@ -1,16 +1,23 @@
 import sys
 import json
-import pickle
 import os.path
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-TOKEN_FILE = os.path.expanduser('~/ansible-netbox/scripts/token.pickle')
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+# Same token store as google_workspace_manager (scripts/token.json), which
+# also migrates a legacy token.pickle on first use
+from google_workspace_manager import TOKEN_FILE, _load_token
 
 def get_creds():
-    with open(TOKEN_FILE, 'rb') as token:
-        creds = pickle.load(token)
+    creds = _load_token()
+    if not creds:
+        print(f"Error: {TOKEN_FILE} not found. Please run google_workspace_manager.py auth first.")
+        sys.exit(1)
     if creds and creds.expired and creds.refresh_token:
         creds.refresh(Request())
     return creds
@@ -11,9 +11,13 @@ headers = {
     "Accept": "application/json",
 }
 
+# Headers are bound once; every call below reuses the pooled connection
+SESSION = requests.Session()
+SESSION.headers.update(headers)
+
 def patch_vm(vm_id, data):
     url = f"{NETBOX_URL}/virtualization/virtual-machines/{vm_id}/"
-    response = requests.patch(url, headers=headers, json=data)
+    response = SESSION.patch(url, json=data)
     if response.status_code == 200:
         print(f"Patched VM {vm_id} successfully.")
     else:
@@ -27,7 +31,7 @@ def create_disk(vm_id, name, size_mb, description=""):
         "size": size_mb,
         "description": description
     }
-    response = requests.post(url, headers=headers, json=data)
+    response = SESSION.post(url, json=data)
     if response.status_code == 201:
         print(f"Created disk for VM {vm_id} successfully.")
     else:
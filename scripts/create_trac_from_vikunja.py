@@ -2,14 +2,21 @@
 """
 ================================================================================
 Filename:       create_trac_from_vikunja.py
-Version:        1.3
+Version:        1.5
 Author:         Gemini CLI
-Last Modified:  2026-07-08
+Last Modified:  2026-10-16
 Context:        http://trac.home.arpa/ticket/3321
 
 Purpose:
     Creates a Trac ticket based on a Vikunja task and links them.
 
+    Update 1.5 (2026-10-16):
+    - Drops get_last_ticket_id.py's cached ID after creating a ticket.
+
+    Update 1.4 (2026-10-16):
+    - TRAC_PASSWORD is resolved via scripts.lib.secret_cache (single-pass ~/.bashrc
+      regex, cached between runs) instead of a per-line scan.
+
     Update 1.3 (2026-07-08):
     - send_to_trac now posts with curl's --data-binary instead of --data. Plain --data
       strips newlines from file content (curl treats it as HTML form encoding), which
@@ -38,26 +45,14 @@ import sys
 import datetime
 from xml.sax.saxutils import escape
 
-def get_trac_password():
-    """Gets the TRAC_PASSWORD, falling back to ~/.bashrc if not set in environment."""
-    password = os.getenv("TRAC_PASSWORD")
-    if password:
-        return password
+# Ensure scripts/lib is in path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from lib.secret_cache import resolve_secret
+from lib import trac_last_id
 
-    bashrc_path = os.path.expanduser("~/.bashrc")
-    if os.path.exists(bashrc_path):
-        try:
-            with open(bashrc_path, "r") as f:
-                for line in f:
-                    if "export TRAC_PASSWORD=" in line:
-                        # Extract value: export TRAC_PASSWORD="value" or export TRAC_PASSWORD=value
-                        parts = line.split("=", 1)
-                        if len(parts) == 2:
-                            val = parts[1].strip().strip('"').strip("'")
-                            return val
-        except Exception:
-            pass
-    return None
+def get_trac_password():
+    """Gets the TRAC_PASSWORD from the environment, a cached copy, or ~/.bashrc."""
+    return resolve_secret("TRAC_PASSWORD")
 
 # Configuration
 VIKUNJA_URL = os.getenv("VIKUNJA_URL", "http://todo.home.arpa")
@@ -226,6 +221,8 @@ def main():
         if "<int>" in response_xml:
             try:
                 ticket_id = response_xml.split("<int>")[1].split("</int>")[0]
+                # get_last_ticket_id.py would otherwise return the previous ID for a few seconds
+                trac_last_id.invalidate()
                 print(f"Successfully created Trac Ticket #{ticket_id}")
                 
                 trac_public_url = f"{TRAC_PUBLIC_URL_BASE}/{ticket_id}"
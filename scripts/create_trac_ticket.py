@@ -2,15 +2,22 @@
 """
 ================================================================================
 Filename:       create_trac_ticket.py
-Version:        1.6
+Version:        1.8
 Author:         Gemini CLI
-Last Modified:  2026-04-10
+Last Modified:  2026-10-16
 Context:        http://trac.gafla.us.com/ticket/3265
 WWOS:           http://wwos.home.arpa/index.php/Trac_Wiki_Formatter
 
 Purpose:
     A helper script to create Trac tickets via the XML-RPC API.
 
+    Update 1.8 (2026-10-16):
+    - Drops get_last_ticket_id.py's cached ID after creating a ticket.
+
+    Update 1.7 (2026-10-16):
+    - TRAC_PASSWORD is resolved via scripts.lib.secret_cache (single-pass ~/.bashrc
+      regex, cached between runs) instead of a per-line scan.
+
     Update 1.6 (2026-04-10):
     - Removed duplicate --milestone argument that caused argparse conflict on startup.
     - Updated DEFAULT_COMPONENT to lowercase 'sysadmin' per standard.
@@ -34,28 +41,13 @@ import sys
 # Ensure scripts/lib is in path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from lib.trac_formatter import markdown_to_moinmoin, sanitize_content
+from lib.secret_cache import resolve_secret
+from lib import trac_last_id
 
 # --- Configuration ---
 def get_trac_password():
-    """Gets the TRAC_PASSWORD, falling back to ~/.bashrc if not set in environment."""
-    password = os.getenv("TRAC_PASSWORD")
-    if password:
-        return password
-
-    bashrc_path = os.path.expanduser("~/.bashrc")
-    if os.path.exists(bashrc_path):
-        try:
-            with open(bashrc_path, "r") as f:
-                for line in f:
-                    if "export TRAC_PASSWORD=" in line:
-                        # Extract value: export TRAC_PASSWORD="value" or export TRAC_PASSWORD=value
-                        parts = line.split("=", 1)
-                        if len(parts) == 2:
-                            val = parts[1].strip().strip('"').strip("'")
-                            return val
-        except Exception:
-            pass
-    return None
+    """Gets the TRAC_PASSWORD from the environment, a cached copy, or ~/.bashrc."""
+    return resolve_secret("TRAC_PASSWORD")
 
 TRAC_USER = os.getenv("TRAC_USER", "will")
 TRAC_PASSWORD = get_trac_password()
@@ -135,6 +127,8 @@ def main():
         server = xmlrpc.client.ServerProxy(TRAC_URL)
 
         ticket_id = server.ticket.create(args.summary, processed_description, attributes, NOTIFY)
+        # get_last_ticket_id.py would otherwise return the previous ID for a few seconds
+        trac_last_id.invalidate()
 
         print("\nSuccessfully created ticket!")
         print(f"  - ID: {ticket_id}")
@@ -2,9 +2,9 @@
 """
 ================================================================================
 Filename:       create_vikunja_task.py
-Version:        1.5
+Version:        1.8
 Author:         Gemini CLI
-Last Modified:  2026-04-16
+Last Modified:  2026-10-16
 Context:        http://trac.home.arpa/ticket/3321
 
 Purpose:
@@ -54,8 +54,19 @@ Arguments:
     --host           The Vikunja instance URL (Default: http://todo.home.arpa).
     --token          The Vikunja API token (Overrides VIKUNJA_API_TOKEN env var).
     --due            Due date (ISO format, e.g., 2026-03-04T13:00:00)
+    --refresh-labels Ignore the local label cache and re-resolve all labels.
 
 Version History:
+    v1.8 (2026-10-16) - Connection reuse:
+        - All API calls go through one urllib3.PoolManager so the label
+          lookups, task creation and label attachment share connections.
+    v1.7 (2026-10-16) - Server-side label search:
+        - Cache misses are resolved with /api/v1/labels?s=<name>, one request
+          per missing label issued in parallel, instead of downloading every
+          label on the instance.
+    v1.6 (2026-10-16) - Cached label lookups:
+        - Label IDs are cached per host in ~/.cache/vikunja_labels.json.
+        - The full label list is only fetched when a label misses the cache.
     v1.4 (2026-03-03) - Added support for task due dates.
     v1.3 (2026-01-30) - Fixed label attachment:
         - Labels are now attached via /api/v1/tasks/{id}/labels endpoint.
@@ -68,7 +79,8 @@ Version History:
         - Portable Python implementation using urllib.
 
 Dependencies:
-    - Standard Python 3 libraries (urllib, json, ssl, argparse).
+    - urllib3 (pinned in requirements.txt; already a dependency of requests).
+    - Standard Python 3 libraries (json, argparse).
 
 Exit Codes:
     0 - Success (Task created successfully)
@@ -79,31 +91,74 @@ Exit Codes:
 import argparse
 import os
 import json
-import urllib.request
-import urllib.error
+import re
 import ssl
+import tempfile
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-def get_ssl_context():
-    ctx = ssl.create_default_context()
-    ctx.check_hostname = False
-    ctx.verify_mode = ssl.CERT_NONE
-    return ctx
+import urllib3
 
-def get_all_labels(host, token):
+LABEL_CACHE_FILE = os.path.expanduser("~/.cache/vikunja_labels.json")
+# Words in the title starting with '*' are labels, e.g. "Buy milk *grocery"
+LABEL_RE = re.compile(r'(?:^|\s)\*(\S*)')
+
+# Built once and handed to the pool, rather than per connection. Certificate
+# checks stay disabled, as before, for self-signed internal hosts.
+SSL_CONTEXT = ssl.create_default_context()
+SSL_CONTEXT.check_hostname = False
+SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# One pool shared by every request (and the label lookup threads).
+# Only GETs are retried after the request was sent: the PUTs that create
+# tasks and labels aren't idempotent, so a retry could duplicate them.
+POOL = urllib3.PoolManager(
+    num_pools=1,
+    maxsize=8,
+    cert_reqs="CERT_NONE",
+    ssl_context=SSL_CONTEXT,
+    timeout=urllib3.Timeout(total=10),
+    retries=urllib3.Retry(total=3, allowed_methods=frozenset({"GET", "HEAD"})),
+)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+def resolve_label(host, token, name):
+    """Look up a single label by case-insensitive title using Vikunja's search."""
     url = f"{host}/api/v1/labels"
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
     }
     try:
-        req = urllib.request.Request(url, headers=headers, method="GET")
-        with urllib.request.urlopen(req, context=get_ssl_context(), timeout=10) as response:
-            if response.status == 200:
-                return json.loads(response.read().decode('utf-8'))
+        response = POOL.request("GET", url, headers=headers, fields={"s": name})
+        if response.status == 200:
+            for label in response.json() or []:
+                if label['title'].lower() == name.lower():
+                    return label
     except Exception as e:
-        print(f"Warning: Could not fetch labels: {e}")
-    return []
+        print(f"Warning: Could not look up label '{name}': {e}")
+    return None
+
+def load_label_cache():
+    try:
+        with open(LABEL_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+        if isinstance(cache, dict):
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_label_cache(cache):
+    cache_dir = os.path.dirname(LABEL_CACHE_FILE)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".vikunja_labels.")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, LABEL_CACHE_FILE)
+    except OSError as e:
+        print(f"Warning: Could not write label cache: {e}")
 
 def create_label(host, token, title):
     url = f"{host}/api/v1/labels"
@@ -111,12 +166,10 @@ def create_label(host, token, title):
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
     }
-    payload = json.dumps({"title": title}).encode('utf-8')
     try:
-        req = urllib.request.Request(url, data=payload, headers=headers, method="PUT")
-        with urllib.request.urlopen(req, context=get_ssl_context(), timeout=10) as response:
-            if response.status in (200, 201):
-                return json.loads(response.read().decode('utf-8'))
+        response = POOL.request("PUT", url, headers=headers, json={"title": title})
+        if response.status in (200, 201):
+            return response.json()
     except Exception as e:
         print(f"Warning: Could not create label '{title}': {e}")
     return None
@@ -127,18 +180,15 @@ def add_label_to_task(host, token, task_id, label_id):
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
     }
-    payload = json.dumps({"label_id": label_id}).encode('utf-8')
     try:
-        req = urllib.request.Request(url, data=payload, headers=headers, method="PUT")
-        with urllib.request.urlopen(req, context=get_ssl_context(), timeout=10) as response:
-            response.read()
-            if response.status in (200, 201):
-                return True
+        response = POOL.request("PUT", url, headers=headers, json={"label_id": label_id})
+        if response.status in (200, 201):
+            return True
     except Exception as e:
         print(f"Warning: Could not attach label ID {label_id} to task {task_id}: {e}")
     return False
 
-def create_task(title, description="", project_id=1, is_favorite=True, host="http://todo.home.arpa", token=None, labels=None, due_date=None):
+def create_task(title, description="", project_id=1, is_favorite=True, host="http://todo.home.arpa", token=None, labels=None, due_date=None, refresh_labels=False):
     if not token:
         token = os.getenv("VIKUNJA_API_TOKEN")
     
@@ -146,14 +196,26 @@ def create_task(title, description="", project_id=1, is_favorite=True, host="htt
         print("Error: VIKUNJA_API_TOKEN environment variable not set and --token not provided.")
         sys.exit(1)
 
-    # Resolve Labels
+    # Resolve Labels (cached per host; search the server only for misses)
     resolved_labels = []
     if labels:
         print("Resolving labels...", end=" ", flush=True)
-        existing_labels = get_all_labels(host, token)
-        # Create a mapping for case-insensitive lookup
-        label_map = {l['title'].lower(): l for l in existing_labels}
-        
+        cache = load_label_cache()
+        label_map = cache.get(host, {})
+        cache_dirty = False
+
+        missing = list(dict.fromkeys(
+            name for name in labels if refresh_labels or name.lower() not in label_map
+        ))
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(8, len(missing))) as pool:
+                found = pool.map(lambda name: resolve_label(host, token, name), missing)
+            for name, label in zip(missing, found):
+                label_map.pop(name.lower(), None)
+                if label:
+                    label_map[label['title'].lower()] = {"id": label['id'], "title": label['title']}
+            cache_dirty = True
+
         for label_name in labels:
             existing = label_map.get(label_name.lower())
             if existing:
@@ -162,7 +224,14 @@ def create_task(title, description="", project_id=1, is_favorite=True, host="htt
                 print(f"(Creating new label '{label_name}')...", end=" ", flush=True)
                 new_label = create_label(host, token, label_name)
                 if new_label:
-                    resolved_labels.append({"id": new_label['id'], "title": new_label['title']})
+                    entry = {"id": new_label['id'], "title": new_label['title']}
+                    label_map[new_label['title'].lower()] = entry
+                    cache_dirty = True
+                    resolved_labels.append(entry)
+
+        if cache_dirty:
+            cache[host] = label_map
+            save_label_cache(cache)
         print("Done.")
 
     url = f"{host}/api/v1/projects/{project_id}/tasks"
@@ -182,34 +251,29 @@ def create_task(title, description="", project_id=1, is_favorite=True, host="htt
     
     # NOTE: Labels are NOT added here in the create payload anymore.
     
-    json_payload = json.dumps(payload).encode('utf-8')
-    
     try:
-        req = urllib.request.Request(url, data=json_payload, headers=headers, method="PUT")
-        with urllib.request.urlopen(req, context=get_ssl_context(), timeout=10) as response:
-            if response.status in (200, 201):
-                result = json.loads(response.read().decode('utf-8'))
-                task_id = result.get('id')
-                print(f"Success: Task created with ID {task_id}")
-                print(f"Title: {result.get('title')}")
-                print(f"Link: {host}/tasks/{task_id}")
-                
-                # Attach Labels
-                if resolved_labels:
-                    print("Attaching labels...", end=" ", flush=True)
-                    count = 0
-                    for label in resolved_labels:
-                        if add_label_to_task(host, token, task_id, label['id']):
-                            count += 1
-                    print(f"Attached {count}/{len(resolved_labels)} labels.")
-                return result
-            else:
-                raise Exception(f"Unexpected status code {response.status}: {response.read().decode('utf-8')}")
+        response = POOL.request("PUT", url, headers=headers, json=payload)
+    except urllib3.exceptions.HTTPError as e:
+        raise Exception(f"URL Error: {e}")
+
+    if response.status not in (200, 201):
+        raise Exception(f"HTTP Error {response.status}: {response.reason} - {response.data.decode('utf-8')}")
 
-    except urllib.error.HTTPError as e:
-        raise Exception(f"HTTP Error {e.code}: {e.reason} - {e.read().decode('utf-8')}")
-    except urllib.error.URLError as e:
-        raise Exception(f"URL Error: {e.reason}")
+    result = response.json()
+    task_id = result.get('id')
+    print(f"Success: Task created with ID {task_id}")
+    print(f"Title: {result.get('title')}")
+    print(f"Link: {host}/tasks/{task_id}")
+    
+    # Attach Labels
+    if resolved_labels:
+        print("Attaching labels...", end=" ", flush=True)
+        count = 0
+        for label in resolved_labels:
+            if add_label_to_task(host, token, task_id, label['id']):
+                count += 1
+        print(f"Attached {count}/{len(resolved_labels)} labels.")
+    return result
 
 def main():
     parser = argparse.ArgumentParser(description="Create a task in Vikunja.")
@@ -220,13 +284,13 @@ def main():
     parser.add_argument("--host", default="http://todo.home.arpa", help="Vikunja host URL")
     parser.add_argument("--token", help="API Token (overrides VIKUNJA_API_TOKEN env var)")
     parser.add_argument("--due", help="Due date (ISO format, e.g., 2026-03-04T13:00:00)")
+    parser.add_argument("--refresh-labels", action="store_true", help="Ignore the local label cache and re-fetch labels")
     
     args = parser.parse_args()
     
     # Parse labels from title
-    words = args.title.split()
-    labels = [w[1:] for w in words if w.startswith('*')]
-    clean_title = ' '.join([w for w in words if not w.startswith('*')])
+    labels = [l for l in LABEL_RE.findall(args.title) if l]
+    clean_title = ' '.join(LABEL_RE.sub(' ', args.title).split())
     
     try:
         create_task(
@@ -237,7 +301,8 @@ def main():
             host=args.host.rstrip('/'),
             token=args.token,
             labels=labels,
-            due_date=args.due
+            due_date=args.due,
+            refresh_labels=args.refresh_labels
         )
     except Exception as e:
         print(f"Error: {e}")
@@ -2,9 +2,9 @@
 """
 ================================================================================
 Filename:       create_wwos.py
-Version:        2.2
+Version:        2.5
 Author:         Will
-Last Modified:  2025-12-12
+Last Modified:  2026-10-16
 
 Purpose:
     Creates or updates pages on the WWOS MediaWiki instance. The script handles
@@ -35,6 +35,9 @@ Usage:
     # Combine options with multiple categories:
     ./create_wwos.py "Page Name" "AI software, Tools" -f content.txt -s "New AI tool page"
 
+    # Create many pages in one run from a JSON Lines file:
+    ./create_wwos.py --batch pages.jsonl
+
 Arguments:
     page_name           The title of the wiki page to create or update
     category            One or more categories, comma-separated 
@@ -42,6 +45,9 @@ Arguments:
     -c, --content       Inline content string for the page body
     -f, --content-file  Path to a file containing the page content
     -s, --summary       Edit summary (default: "Page created by automated script")
+    --batch             Path to a JSON Lines file; each line is an object with
+                        "page_name", "category" and optional "content" and
+                        "summary". Replaces page_name/category.
 
 MediaWiki Formatting Guide:
     - Newlines:       Standard newline characters (`\n`) in content files are 
@@ -55,6 +61,18 @@ MediaWiki Formatting Guide:
     - Code Blocks:    <code>Your code here</code>
 
 Version History:
+    v2.5 (2026-10-16) - Batch error handling:
+        - --batch reports a failed login as an error instead of a traceback
+        - Concurrent edits that hit an expired token re-login only once
+    v2.4 (2026-10-16) - Batch page creation:
+        - Added --batch to create many pages in one process, sharing a single
+          login/CSRF token and running up to BATCH_WORKERS edits at a time
+    v2.3 (2026-10-16) - Reuse login and CSRF token across edits:
+        - Split authentication into login(), get_csrf() and edit_page()
+        - The logged-in session and CSRF token are cached at module level,
+          so repeated create_wwos_page() calls (MCP server, batch drivers)
+          only pay the login round-trips once
+        - A stale token ("badtoken") triggers one re-login and retry
     v2.2 (2025-12-12) - Added MediaWiki Formatting Guide to header.
     v2.1 (2025-12-11) - Multiple category support:
         - Enhanced category argument to accept comma-separated list of categories
@@ -94,7 +112,12 @@ Exit Codes:
 ================================================================================
 """
 import argparse
+import functools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import sys
 import re
@@ -102,7 +125,10 @@ import re
 # MediaWiki API endpoint and credentials
 API_URL = "http://wwos.home.arpa/api.php"
 USERNAME = "will"
+BATCH_WORKERS = 4  # matches the session's connection pool size
 PASSWORD = os.getenv("WWOS_PASSWORD")
+# Serialises re-login so batch workers with the same stale token log in once
+_RELOGIN_LOCK = threading.Lock()
 
 if not PASSWORD:
     # Try to find it in .bashrc
@@ -116,12 +142,10 @@ if not PASSWORD:
                     break
 
 
-def get_authenticated_session():
+def login(session):
     """
-    Returns an authenticated requests.Session for the WWOS MediaWiki.
+    Logs the given requests.Session into the WWOS MediaWiki and returns it.
     """
-    session = requests.Session()
-
     # 1. Get login token
     login_token_response = session.get(API_URL, params={
         "action": "query",
@@ -148,12 +172,42 @@ def get_authenticated_session():
         
     return session
 
+def get_csrf(session):
+    """
+    Returns a CSRF token for editing with an authenticated session.
+    """
+    csrf_token_response = session.get(API_URL, params={
+        "action": "query",
+        "meta": "tokens",
+        "format": "json"
+    })
+    csrf_token_response.raise_for_status()
+    return csrf_token_response.json()["query"]["tokens"]["csrftoken"]
+
+def get_authenticated_session():
+    """
+    Returns a new authenticated requests.Session for the WWOS MediaWiki.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=4))
+    session.mount("https://", HTTPAdapter(pool_maxsize=4))
+    return login(session)
+
+@functools.lru_cache(maxsize=1)
+def _get_authed_session():
+    """
+    Returns a cached (session, csrf_token) pair, logging in on first use.
+    Call _get_authed_session.cache_clear() to force a fresh login.
+    """
+    session = get_authenticated_session()
+    return session, get_csrf(session)
+
 def page_exists(page_name, session=None):
     """
     Checks if a page exists on the WWOS MediaWiki.
     """
     if session is None:
-        session = get_authenticated_session()
+        session, _ = _get_authed_session()
         
     response = session.get(API_URL, params={
         "action": "query",
@@ -177,7 +231,7 @@ def get_page_content(page_name, session=None):
     Returns None if page does not exist.
     """
     if session is None:
-        session = get_authenticated_session()
+        session, _ = _get_authed_session()
 
     response = session.get(API_URL, params={
         "action": "query",
@@ -199,6 +253,25 @@ def get_page_content(page_name, session=None):
             return revisions[0].get("*", "")
     return None
 
+def edit_page(session, csrf_token, page_name, content, summary):
+    """
+    Creates or updates a page with the given wikitext and returns the
+    parsed API response.
+    """
+    edit_data = {
+        "action": "edit",
+        "title": page_name,
+        "text": content,
+        "token": csrf_token,
+        "format": "json",
+        "summary": summary,
+    }
+    # Note: Omitting 'createonly' allows both creation and updates
+    
+    edit_response = session.post(API_URL, data=edit_data)
+    edit_response.raise_for_status()
+    return edit_response.json()
+
 def create_wwos_page(page_name, categories, summary="Page created by script", content_body=None):
     """
     Creates or updates a page on the WWOS MediaWiki instance.
@@ -209,18 +282,7 @@ def create_wwos_page(page_name, categories, summary="Page created by script", co
         summary: Edit summary for the change
         content_body: Optional body content for the page
     """
-    session = get_authenticated_session()
-
-    # 3. Get CSRF token for editing
-    csrf_token_response = session.get(API_URL, params={
-        "action": "query",
-        "meta": "tokens",
-        "format": "json"
-    })
-    csrf_token_response.raise_for_status()
-    csrf_token = csrf_token_response.json()["query"]["tokens"]["csrftoken"]
-
-    # 4. Construct page content
+    # Construct page content
     if content_body and content_body.strip().upper().startswith("#REDIRECT"):
         content = content_body.strip()
     elif page_name.startswith("Module:"):
@@ -241,21 +303,17 @@ def create_wwos_page(page_name, categories, summary="Page created by script", co
         for cat in category_list:
             content += f"[[Category:{cat}]]\n"
 
-    # 5. Create or update the page
-    edit_data = {
-        "action": "edit",
-        "title": page_name,
-        "text": content,
-        "token": csrf_token,
-        "format": "json",
-        "summary": summary,
-    }
-    # Note: Omitting 'createonly' allows both creation and updates
-    
-    edit_response = session.post(API_URL, data=edit_data)
-    edit_response.raise_for_status()
-    
-    result = edit_response.json()
+    # Create or update the page, re-authenticating once if the cached
+    # session or token has expired
+    session, csrf_token = _get_authed_session()
+    result = edit_page(session, csrf_token, page_name, content, summary)
+    if result.get("error", {}).get("code") in ("badtoken", "notloggedin", "assertuserfailed"):
+        with _RELOGIN_LOCK:
+            # Another worker may already have replaced the stale session
+            if _get_authed_session() == (session, csrf_token):
+                _get_authed_session.cache_clear()
+            session, csrf_token = _get_authed_session()
+        result = edit_page(session, csrf_token, page_name, content, summary)
 
     if "edit" in result and result["edit"].get("result") == "Success":
         page_id = result["edit"].get("pageid", "N/A")
@@ -276,6 +334,41 @@ def create_wwos_page(page_name, categories, summary="Page created by script", co
         return False
 
 
+def create_many(pages, summary="Page created by automated script"):
+    """
+    Creates or updates several pages concurrently over one authenticated
+    session. Returns the number of pages that failed.
+
+    Args:
+        pages: Iterable of dicts with "page_name", "category" and optional
+               "content" and "summary" keys
+        summary: Default edit summary for pages without their own
+    """
+    pages = list(pages)
+    # Log in once up front so the worker threads share the cached session
+    try:
+        _get_authed_session()
+    except Exception as e:
+        print(f"Error logging in to WWOS: {e}", file=sys.stderr)
+        return len(pages)
+
+    def _create(page):
+        try:
+            return create_wwos_page(
+                page_name=page["page_name"],
+                categories=page.get("category", ""),
+                summary=page.get("summary", summary),
+                content_body=page.get("content")
+            )
+        except Exception as e:
+            print(f"Error creating '{page.get('page_name')}': {e}", file=sys.stderr)
+            return False
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        results = list(pool.map(_create, pages))
+    return results.count(False)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Create or update a WWOS MediaWiki page.",
@@ -286,17 +379,21 @@ Examples:
   %(prog)s "My Page" "AI software, Tools, Projects"
   %(prog)s "My Page" "General" -c "This is the page content"
   %(prog)s "My Page" "General" -f content.txt -s "Updated from file"
+  %(prog)s --batch pages.jsonl
         """
     )
-    parser.add_argument("page_name", help="The name of the page to create/update")
-    parser.add_argument("category", 
+    parser.add_argument("page_name", nargs="?", help="The name of the page to create/update")
+    parser.add_argument("category", nargs="?",
                         help="Category or comma-separated categories (e.g., 'General' or 'AI software, Tools')")
     parser.add_argument("-s", "--summary", default="Page created by automated script",
                         help="Edit summary (default: 'Page created by automated script')")
     parser.add_argument("-c", "--content", help="Content string for the page body")
     parser.add_argument("-f", "--content-file", help="Path to a file containing page content")
+    parser.add_argument("--batch", help="JSON Lines file of pages to create/update")
     
     args = parser.parse_args()
+    if not args.batch and not (args.page_name and args.category):
+        parser.error("page_name and category are required unless --batch is given")
 
     # Check for password
     if not PASSWORD:
@@ -304,6 +401,16 @@ Examples:
         print("Set it with: export WWOS_PASSWORD='your_password'", file=sys.stderr)
         sys.exit(1)
 
+    if args.batch:
+        try:
+            with open(args.batch, 'r') as f:
+                pages = [json.loads(line) for line in f if line.strip()]
+        except (IOError, ValueError) as e:
+            print(f"Error reading batch file: {e}", file=sys.stderr)
+            sys.exit(1)
+        failures = create_many(pages, summary=args.summary)
+        sys.exit(0 if failures == 0 else 1)
+
     # Determine content source (file takes precedence)
     page_content = None
     if args.content_file:
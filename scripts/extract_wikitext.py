@@ -1,16 +1,25 @@
 import json
 import sys
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 input_file = "tmp/wikitext_raw.json"
 output_file = "tmp/wikitext.txt"
 
-with open(input_file, "r") as f:
-    data = json.load(f)
+with open(input_file, "rb") as f:
+    if ijson:
+        # Stream just the first page instead of building the whole dict tree
+        _, page = next(ijson.kvitems(f, "query.pages"))
+    else:
+        data = json.load(f)
+        page = next(iter(data["query"]["pages"].values()))
 
-page_id = list(data["query"]["pages"].keys())[0]
-wikitext = data["query"]["pages"][page_id]["revisions"][0]["*"]
+wikitext = page["revisions"][0]["*"]
 
-with open(output_file, "w") as f:
-    f.write(wikitext)
+with open(output_file, "wb") as f:
+    f.write(wikitext.encode("utf-8"))
 
-print(f"Wikitext extracted to {output_file}")
\ No newline at end of file
+print(f"Wikitext extracted to {output_file}")
@@ -1,6 +1,8 @@
 import os
+import sys
 import requests
 import json
+from dataclasses import dataclass
 
 NETBOX_URL = "http://netbox1.home.arpa/api"
 NETBOX_TOKEN = os.environ.get("NETBOX_TOKEN")
@@ -11,36 +13,96 @@ headers = {
     "Accept": "application/json",
 }
 
-def patch_vm(vm_id, data):
-    url = f"{NETBOX_URL}/virtualization/virtual-machines/{vm_id}/"
-    response = requests.patch(url, headers=headers, json=data)
+SESSION = requests.Session()
+SESSION.headers.update(headers)
+
+def patch_vms(vm_updates):
+    # Bulk PATCH: one request with a list body, each item carrying its id
+    if not vm_updates:
+        return
+    url = f"{NETBOX_URL}/virtualization/virtual-machines/"
+    response = SESSION.patch(url, json=vm_updates)
     if response.status_code == 200:
-        print(f"Patched VM {vm_id} ({data.get('name', 'unnamed')}) successfully.")
-    else:
-        print(f"Failed to patch VM {vm_id}: {response.text}")
-
-def create_or_update_disk(vm_id, name, size_mb, description=""):
-    # Check if disk exists
-    url = f"{NETBOX_URL}/virtualization/virtual-disks/?virtual_machine_id={vm_id}&name={name}"
-    response = requests.get(url, headers=headers)
-    results = response.json().get('results', [])
-    
-    if results:
-        disk_id = results[0]['id']
-        url = f"{NETBOX_URL}/virtualization/virtual-disks/{disk_id}/"
-        data = {"size": size_mb, "description": description}
-        response = requests.patch(url, headers=headers, json=data)
-        print(f"Updated disk {disk_id} for VM {vm_id}.")
+        for vm in response.json():
+            print(f"Patched VM {vm['id']} ({vm.get('name', 'unnamed')}) successfully.")
     else:
-        url = f"{NETBOX_URL}/virtualization/virtual-disks/"
-        data = {
-            "virtual_machine": vm_id,
-            "name": name,
-            "size": size_mb,
-            "description": description
-        }
-        response = requests.post(url, headers=headers, json=data)
-        print(f"Created disk for VM {vm_id}.")
+        print(f"Failed to patch VMs: {response.text}")
+
+def get_all(url):
+    # Follow NetBox pagination and return every result
+    results = []
+    while url:
+        response = SESSION.get(url)
+        response.raise_for_status()
+        page = response.json()
+        results.extend(page.get('results', []))
+        url = page.get('next')
+    return results
+
+def get_vms(vm_ids):
+    ids = ",".join(str(vm_id) for vm_id in vm_ids)
+    url = f"{NETBOX_URL}/virtualization/virtual-machines/?id__in={ids}&limit=200"
+    return {vm['id']: vm for vm in get_all(url)}
+
+def get_existing_disks(vm_ids, name):
+    # One query for all VMs instead of a GET per VM
+    ids = ",".join(str(vm_id) for vm_id in vm_ids)
+    url = f"{NETBOX_URL}/virtualization/virtual-disks/?virtual_machine_id__in={ids}&name={name}&limit=200"
+    return {disk['virtual_machine']['id']: disk for disk in get_all(url)}
+
+def vm_needs_update(vm, device_id, cluster_id):
+    if not vm:
+        return True
+    return (vm.get('device') or {}).get('id') != device_id or (vm.get('cluster') or {}).get('id') != cluster_id
+
+def upsert_disks(disks, existing):
+    # Split into bulk PATCH (disk already exists) and bulk POST (new disk)
+    to_update = []
+    to_create = []
+    for disk in disks:
+        cur = existing.get(disk['virtual_machine'])
+        if not cur:
+            to_create.append(disk)
+        elif cur.get('size') == disk['size'] and (cur.get('description') or '') == disk['description']:
+            print(f"Disk {cur['id']} for VM {disk['virtual_machine']} already up to date.")
+        else:
+            to_update.append({"id": cur['id'], "size": disk['size'], "description": disk['description']})
+
+    url = f"{NETBOX_URL}/virtualization/virtual-disks/"
+    if to_update:
+        response = SESSION.patch(url, json=to_update)
+        if response.status_code == 200:
+            for disk in response.json():
+                print(f"Updated disk {disk['id']} for VM {disk['virtual_machine']['id']}.")
+        else:
+            print(f"Failed to update disks: {response.text}")
+    if to_create:
+        response = SESSION.post(url, json=to_create)
+        if response.status_code == 201:
+            for disk in response.json():
+                print(f"Created disk for VM {disk['virtual_machine']['id']}.")
+        else:
+            print(f"Failed to create disks: {response.text}")
+
+@dataclass(slots=True, frozen=True)
+class Update:
+    id: int
+    host: int
+    cluster: int
+    disk: int
+    name: str
+
+def validate_updates(updates):
+    # Single pass over the table before any NetBox I/O
+    errors = []
+    seen = set()
+    for up in updates:
+        if up.id in seen:
+            errors.append(f"duplicate VM id {up.id} ({up.name})")
+        seen.add(up.id)
+        if up.disk <= 0:
+            errors.append(f"VM {up.id} ({up.name}) has non-positive disk size {up.disk}")
+    return errors
 
 # VM ID mapping and data
 # Hosts: 10 (proxmox1), 13 (pve2)
@@ -48,28 +110,52 @@ def create_or_update_disk(vm_id, name, size_mb, description=""):
 
 updates = [
     # Proxmox1 (Hestia) - Cluster 1
-    {"id": 1, "host": 10, "cluster": 1, "disk": 18432, "name": "netbox1"},
-    {"id": 6, "host": 10, "cluster": 1, "disk": 4096, "name": "mne-server"},
-    {"id": 9, "host": 10, "cluster": 1, "disk": 20480, "name": "mw2-pve"},
-    {"id": 13, "host": 10, "cluster": 1, "disk": 30720, "name": "wazuh-siem"},
-    {"id": 15, "host": 10, "cluster": 1, "disk": 8192, "name": "unifi"},
-    {"id": 10, "host": 10, "cluster": 1, "disk": 32768, "name": "homeassistant"},
-    {"id": 4, "host": 10, "cluster": 1, "disk": 71680, "name": "ynh2"},
+    Update(id=1, host=10, cluster=1, disk=18432, name="netbox1"),
+    Update(id=6, host=10, cluster=1, disk=4096, name="mne-server"),
+    Update(id=9, host=10, cluster=1, disk=20480, name="mw2-pve"),
+    Update(id=13, host=10, cluster=1, disk=30720, name="wazuh-siem"),
+    Update(id=15, host=10, cluster=1, disk=8192, name="unifi"),
+    Update(id=10, host=10, cluster=1, disk=32768, name="homeassistant"),
+    Update(id=4, host=10, cluster=1, disk=71680, name="ynh2"),
 
     # PVE2 (Z420) - Cluster 6
-    {"id": 20, "host": 13, "cluster": 6, "disk": 30720, "name": "graylog"},
-    {"id": 16, "host": 13, "cluster": 6, "disk": 10240, "name": "paperless-ngx"},
-    {"id": 18, "host": 13, "cluster": 6, "disk": 10240, "name": "n8n"},
-    {"id": 17, "host": 13, "cluster": 6, "disk": 4096, "name": "gmailctl-ansible"},
-    {"id": 19, "host": 13, "cluster": 6, "disk": 10240, "name": "pbs01"},
-    {"id": 21, "host": 13, "cluster": 6, "disk": 5120, "name": "pihole-primary"},
-    {"id": 23, "host": 13, "cluster": 6, "disk": 8192, "name": "trac-lxc"},
-    {"id": 24, "host": 13, "cluster": 6, "disk": 16384, "name": "vik-01"},
-    {"id": 14, "host": 13, "cluster": 6, "disk": 10240, "name": "tandoor"},
-    {"id": 26, "host": 13, "cluster": 6, "disk": 4096, "name": "ot-recorder"},
-    {"id": 27, "host": 13, "cluster": 6, "disk": 4096, "name": "caddy01"},
+    Update(id=20, host=13, cluster=6, disk=30720, name="graylog"),
+    Update(id=16, host=13, cluster=6, disk=10240, name="paperless-ngx"),
+    Update(id=18, host=13, cluster=6, disk=10240, name="n8n"),
+    Update(id=17, host=13, cluster=6, disk=4096, name="gmailctl-ansible"),
+    Update(id=19, host=13, cluster=6, disk=10240, name="pbs01"),
+    Update(id=21, host=13, cluster=6, disk=5120, name="pihole-primary"),
+    Update(id=23, host=13, cluster=6, disk=8192, name="trac-lxc"),
+    Update(id=24, host=13, cluster=6, disk=16384, name="vik-01"),
+    Update(id=14, host=13, cluster=6, disk=10240, name="tandoor"),
+    Update(id=26, host=13, cluster=6, disk=4096, name="ot-recorder"),
+    Update(id=27, host=13, cluster=6, disk=4096, name="caddy01"),
 ]
 
-for up in updates:
-    patch_vm(up['id'], {"device": up['host'], "cluster": up['cluster']})
-    create_or_update_disk(up['id'], "rootfs", up['disk'], "Primary root filesystem")
+errors = validate_updates(updates)
+if errors:
+    for err in errors:
+        print(f"Invalid update: {err}", file=sys.stderr)
+    sys.exit(1)
+
+vm_ids = [up.id for up in updates]
+existing_vms = get_vms(vm_ids)
+existing_disks = get_existing_disks(vm_ids, "rootfs")
+
+patch_vms([
+    {"id": up.id, "device": up.host, "cluster": up.cluster}
+    for up in updates
+    if vm_needs_update(existing_vms.get(up.id), up.host, up.cluster)
+])
+upsert_disks(
+    [
+        {
+            "virtual_machine": up.id,
+            "name": "rootfs",
+            "size": up.disk,
+            "description": "Primary root filesystem",
+        }
+        for up in updates
+    ],
+    existing_disks,
+)
@@ -2,9 +2,9 @@
 """
 ================================================================================
 Filename:       scripts/gcp_manager.py
-Version:        1.0
+Version:        1.2
 Author:         Gemini CLI
-Last Modified:  2026-03-11
+Last Modified:  2026-10-16
 Context:        http://trac.gafla.us.com/ticket/3169
 
 Purpose:
@@ -18,25 +18,31 @@ Usage:
     python3 gcp_manager.py disable-gae <project_id>
 
 Revision History:
+    v1.2 (2026-10-16): Load credentials via google_workspace_manager._load_token, so a
+                       legacy token.pickle is migrated here too.
+    v1.1 (2026-10-16): Read credentials from token.json (google_workspace_manager v1.37).
     v1.0 (2026-03-11): Initial version with project, billing, and GAE tools.
 
 Notes:
-    Uses credentials from scripts/token.pickle.
+    Uses credentials from scripts/token.json (or a legacy token.pickle, which
+    google_workspace_manager migrates to token.json on first load).
 ================================================================================
 """
 
 import os
 import sys
 import json
-import pickle
 from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-TOKEN_FILE = os.path.join(SCRIPT_DIR, 'token.pickle')
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+# Shares the token store (and token.pickle migration) with the workspace manager
+from google_workspace_manager import TOKEN_FILE, _load_token
 
 # Additional scopes needed for GCP management
 GCP_SCOPES = [
@@ -45,16 +51,14 @@ GCP_SCOPES = [
 ]
 
 def get_creds(quota_project=None):
-    if not os.path.exists(TOKEN_FILE):
+    creds = _load_token()
+    if not creds:
         print(f"Error: {TOKEN_FILE} not found. Please run google_workspace_manager.py auth first.")
         sys.exit(1)
     
-    with open(TOKEN_FILE, 'rb') as token:
-        creds = pickle.load(token)
-    
     # Check if creds has cloud-platform scope
     if not any(scope in creds.scopes for scope in GCP_SCOPES):
-        print("Error: Current token.pickle does not have cloud-platform scopes.")
+        print("Error: Current token.json does not have cloud-platform scopes.")
         print("Please re-authenticate with broader scopes.")
         sys.exit(1)
 
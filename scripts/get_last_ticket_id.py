@@ -1,32 +1,26 @@
 #!/usr/bin/env python3
 """
 A helper script to retrieve the most recent Trac ticket ID.
+
+The result is cached for a few seconds (per user, see lib.trac_last_id) so
+shell loops that call this script repeatedly do not each pay for a fresh
+XML-RPC login. The ticket creation scripts drop the cache.
 """
+import functools
 import xmlrpc.client
 
 import os
+import sys
+
+# Ensure scripts/lib is in path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from lib.secret_cache import resolve_secret
+from lib.trac_last_id import read_cached_id, write_cached_id
 
 # --- Configuration ---
 def get_trac_password():
-    """Gets the TRAC_PASSWORD, falling back to ~/.bashrc if not set in environment."""
-    password = os.getenv("TRAC_PASSWORD")
-    if password:
-        return password
-
-    bashrc_path = os.path.expanduser("~/.bashrc")
-    if os.path.exists(bashrc_path):
-        try:
-            with open(bashrc_path, "r") as f:
-                for line in f:
-                    if "export TRAC_PASSWORD=" in line:
-                        # Extract value: export TRAC_PASSWORD="value" or export TRAC_PASSWORD=value
-                        parts = line.split("=", 1)
-                        if len(parts) == 2:
-                            val = parts[1].strip().strip('"').strip("'")
-                            return val
-        except Exception:
-            pass
-    return None
+    """Gets the TRAC_PASSWORD from the environment, a cached copy, or ~/.bashrc."""
+    return resolve_secret("TRAC_PASSWORD")
 
 TRAC_USER = os.getenv("TRAC_USER", "will")
 TRAC_PASSWORD = get_trac_password()
@@ -39,14 +33,30 @@ if not TRAC_PASSWORD:
 
 TRAC_URL = f"http://{TRAC_USER}:{TRAC_PASSWORD}@{TRAC_HOST}{TRAC_PATH}"
 
+@functools.lru_cache(maxsize=1)
+def get_server():
+    """Returns a shared ServerProxy; its transport keeps the HTTP connection open."""
+    return xmlrpc.client.ServerProxy(TRAC_URL, use_builtin_types=True)
+
+def get_last_ticket_id():
+    """Returns the most recent Trac ticket ID, or None if there are no tickets."""
+    ticket_id = read_cached_id()
+    if ticket_id is not None:
+        return ticket_id
+
+    ticket_list = get_server().ticket.query("max=1&order=id&desc=1")
+    if not ticket_list:
+        return None
+    write_cached_id(ticket_list[0])
+    return ticket_list[0]
+
 def main():
     """Retrieves the most recent Trac ticket ID."""
     try:
-        server = xmlrpc.client.ServerProxy(TRAC_URL)
-        ticket_list = server.ticket.query("max=1&order=id&desc=1")
+        ticket_id = get_last_ticket_id()
         
-        if ticket_list:
-            print(ticket_list[0])
+        if ticket_id is not None:
+            print(ticket_id)
         else:
             print("No tickets found.")
 
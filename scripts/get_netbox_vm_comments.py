@@ -3,6 +3,8 @@ import os
 import sys
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # Configuration
 NETBOX_URL = "http://netbox1.home.arpa"
@@ -18,10 +20,20 @@ HEADERS = {
     "Accept": "application/json",
 }
 
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=4))
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=4))
+
 def search_wazuh():
+    # Query VMs and Devices in parallel over the shared session
+    params = {"q": "wazuh"}
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_vm = ex.submit(SESSION.get, f"{NETBOX_URL}/api/virtualization/virtual_machines/", params=params)
+        fut_dev = ex.submit(SESSION.get, f"{NETBOX_URL}/api/dcim/devices/", params=params)
+
     # Check VMs
-    url = f"{NETBOX_URL}/api/virtualization/virtual_machines/?q=wazuh"
-    resp = requests.get(url, headers=HEADERS, verify=False)
+    resp = fut_vm.result()
     if resp.ok:
         print(f"VMs found: {resp.json()['count']}")
         for vm in resp.json()['results']:
@@ -30,8 +42,7 @@ def search_wazuh():
             print("-" * 20)
 
     # Check Devices
-    url = f"{NETBOX_URL}/api/dcim/devices/?q=wazuh"
-    resp = requests.get(url, headers=HEADERS, verify=False)
+    resp = fut_dev.result()
     if resp.ok:
         print(f"Devices found: {resp.json()['count']}")
         for dev in resp.json()['results']:
@@ -1,28 +1,25 @@
 #!/usr/bin/env python3
 """
 Retrieves details for a specific Virtual Machine from NetBox.
-Usage: ./get_netbox_vm_details.py <vm_name>
+Usage: ./get_netbox_vm_details.py <vm_name> [--json]
 """
 import os
 import sys
 import requests
+import urllib3
 import json
 import argparse
+from pprint import pp
+from requests.adapters import HTTPAdapter
+
+# Ensure scripts/lib is in path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from lib.secret_cache import resolve_secret
 
 # Configuration
 NETBOX_URL = "http://netbox1.home.arpa"
-NETBOX_TOKEN = os.environ.get("NETBOX_TOKEN")
-
-if not NETBOX_TOKEN:
-    # Try reading from ~/.bashrc if environment variable is not set
-    try:
-        with open(os.path.expanduser("~/.bashrc"), "r") as f:
-            for line in f:
-                if "export NETBOX_TOKEN=" in line:
-                    NETBOX_TOKEN = line.split("=")[1].strip().strip('"')
-                    break
-    except Exception:
-        pass
+# Environment first, then a cached copy, then ~/.bashrc
+NETBOX_TOKEN = resolve_secret("NETBOX_TOKEN")
 
 if not NETBOX_TOKEN:
     print("Error: NETBOX_TOKEN environment variable not set.", file=sys.stderr)
@@ -34,13 +31,22 @@ HEADERS = {
     "Accept": "application/json",
 }
 
+# Shared session: TLS settings, headers and pooled connections are set once
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+SESSION = requests.Session()
+SESSION.verify = False
+SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 def get_vm_details(vm_name):
     """Fetches full details for a VM by name."""
     url = f"{NETBOX_URL}/api/virtualization/virtual-machines/"
     params = {"name": vm_name}
     
     try:
-        response = requests.get(url, headers=HEADERS, params=params, verify=False)
+        response = SESSION.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -59,11 +65,14 @@ def get_vm_details(vm_name):
 def main():
     parser = argparse.ArgumentParser(description="Get NetBox VM details.")
     parser.add_argument("vm_name", help="Name of the Virtual Machine")
+    parser.add_argument("--json", action="store_true", help="Print the full VM record as JSON")
     args = parser.parse_args()
 
     vm = get_vm_details(args.vm_name)
     
-    if vm:
+    if vm and args.json:
+        print(json.dumps(vm, indent=2))
+    elif vm:
         print("-" * 40)
         print(f"VM: {vm.get('name')} (ID: {vm.get('id')})")
         print("-" * 40)
@@ -84,7 +93,7 @@ def main():
         if custom_fields:
             print("-" * 40)
             print("Custom Fields:")
-            print(json.dumps(custom_fields, indent=2))
+            pp(custom_fields, width=100)
 
 if __name__ == "__main__":
     main()
@@ -5,29 +5,16 @@ A helper script to retrieve Trac ticket attachments via the XML-RPC API.
 import xmlrpc.client
 import argparse
 import os
-import base64
+import sys
+
+# Ensure scripts/lib is in path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from lib.secret_cache import resolve_secret
 
 # --- Configuration ---
 def get_trac_password():
-    """Gets the TRAC_PASSWORD, falling back to ~/.bashrc if not set in environment."""
-    password = os.getenv("TRAC_PASSWORD")
-    if password:
-        return password
-
-    bashrc_path = os.path.expanduser("~/.bashrc")
-    if os.path.exists(bashrc_path):
-        try:
-            with open(bashrc_path, "r") as f:
-                for line in f:
-                    if "export TRAC_PASSWORD=" in line:
-                        # Extract value: export TRAC_PASSWORD="value" or export TRAC_PASSWORD=value
-                        parts = line.split("=", 1)
-                        if len(parts) == 2:
-                            val = parts[1].strip().strip('"').strip("'")
-                            return val
-        except Exception:
-            pass
-    return None
+    """Gets the TRAC_PASSWORD from the environment, a cached copy, or ~/.bashrc."""
+    return resolve_secret("TRAC_PASSWORD")
 
 TRAC_USER = os.getenv("TRAC_USER", "will")
 TRAC_PASSWORD = get_trac_password()
@@ -46,19 +33,25 @@ def main():
     args = parser.parse_args()
 
     try:
-        server = xmlrpc.client.ServerProxy(TRAC_URL)
+        # use_builtin_types: attachment contents arrive as plain bytes, not Binary wrappers
+        server = xmlrpc.client.ServerProxy(TRAC_URL, use_builtin_types=True)
         attachments = server.ticket.listAttachments(args.ticket_id)
         
+        # Fetch content for all log attachments in a single system.multicall request
+        log_files = [attachment[0] for attachment in attachments if "log" in attachment[0]]
+        contents = {}
+        if log_files:
+            multicall = xmlrpc.client.MultiCall(server)
+            for filename in log_files:
+                multicall.ticket.getAttachment(args.ticket_id, filename)
+            contents = dict(zip(log_files, multicall()))
+
         print(f"Attachments for Ticket #{args.ticket_id}:")
         for attachment in attachments:
             filename = attachment[0]
             print(f"- {filename}")
-            # Fetch content for logs
-            if "log" in filename:
-                content_rpc = server.ticket.getAttachment(args.ticket_id, filename)
-                # content_rpc is usually binary data base64 encoded or similar depending on library version
-                # In standard xmlrpc.client, Binary objects are returned.
-                file_data = content_rpc.data
+            if filename in contents:
+                file_data = contents[filename]
                 print(f"--- Content of {filename} ---")
                 try:
                     print(file_data.decode('utf-8'))
@@ -4,31 +4,18 @@ A helper script to retrieve Trac ticket details via the XML-RPC API.
 """
 import xmlrpc.client
 import argparse
-import textwrap
 
 import os
+import sys
+
+# Ensure scripts/lib is in path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from lib.secret_cache import resolve_secret
 
 # --- Configuration ---
 def get_trac_password():
-    """Gets the TRAC_PASSWORD, falling back to ~/.bashrc if not set in environment."""
-    password = os.getenv("TRAC_PASSWORD")
-    if password:
-        return password
-
-    bashrc_path = os.path.expanduser("~/.bashrc")
-    if os.path.exists(bashrc_path):
-        try:
-            with open(bashrc_path, "r") as f:
-                for line in f:
-                    if "export TRAC_PASSWORD=" in line:
-                        # Extract value: export TRAC_PASSWORD="value" or export TRAC_PASSWORD=value
-                        parts = line.split("=", 1)
-                        if len(parts) == 2:
-                            val = parts[1].strip().strip('"').strip("'")
-                            return val
-        except Exception:
-            pass
-    return None
+    """Gets the TRAC_PASSWORD from the environment, a cached copy, or ~/.bashrc."""
+    return resolve_secret("TRAC_PASSWORD")
 
 TRAC_USER = os.getenv("TRAC_USER", "will")
 TRAC_PASSWORD = get_trac_password()
@@ -52,7 +39,11 @@ def main():
 
     try:
         server = xmlrpc.client.ServerProxy(TRAC_URL)
-        ticket = server.ticket.get(args.ticket_id)
+        # Fetch the ticket and its changelog in a single system.multicall request
+        multicall = xmlrpc.client.MultiCall(server)
+        multicall.ticket.get(args.ticket_id)
+        multicall.ticket.changeLog(args.ticket_id)
+        ticket, changelog = multicall()
         
         # The result is a list: [id, time_created, time_changed, attributes]
         attributes = ticket[3]
@@ -68,17 +59,11 @@ def main():
 
         print("\n" + "-" * 20)
         print("Comments:")
-        changelog = server.ticket.changeLog(args.ticket_id)
-        for change in changelog:
-            # Change structure: [time, author, field, oldvalue, newvalue, permanent]
-            field = change[2]
-            if field == 'comment':
-                author = change[1]
-                timestamp = change[0]
-                comment_text = change[4]
-                if comment_text:
-                    print(f"\n--- {author} at {timestamp} ---")
-                    print(comment_text)
+        # Change structure: [time, author, field, oldvalue, newvalue, permanent]
+        comments = [(c[0], c[1], c[4]) for c in changelog if c[2] == 'comment' and c[4]]
+        for timestamp, author, comment_text in comments:
+            print(f"\n--- {author} at {timestamp} ---")
+            print(comment_text)
 
     except xmlrpc.client.Fault as err:
         print(f"\nError: XML-RPC Fault {err.faultCode}")
@@ -1,25 +1,38 @@
 import argparse
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def get_wwos_page(page_title):
-    url = "http://wwos.home.arpa/api.php"
+API_URL = "http://wwos.home.arpa/api.php"
+# MediaWiki allows up to 50 titles per query for normal users
+TITLES_PER_QUERY = 50
+
+# Shared session so repeated calls (e.g. from a wrapper fetching many pages)
+# reuse pooled keep-alive connections and retry transient failures
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                                     max_retries=Retry(total=3, backoff_factor=0.3)))
+
+def get_wwos_page(page_title, session=None):
+    session = session or SESSION
     params = {
         "action": "parse",
         "page": page_title,
         "format": "json",
         "prop": "wikitext"
     }
-    
+
     try:
-        response = requests.get(url, params=params)
+        response = session.get(API_URL, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
-        
+
         if "error" in data:
             print(f"Error: {data['error']['info']}", file=sys.stderr)
             sys.exit(1)
-            
+
         if "parse" in data and "wikitext" in data["parse"]:
             print(data["parse"]["wikitext"]["*"])
         else:
@@ -30,9 +43,79 @@ def get_wwos_page(page_title):
         print(f"Network error: {e}", file=sys.stderr)
         sys.exit(1)
 
+def _fetch_titles(titles, session):
+    """
+    Fetches wikitext for up to TITLES_PER_QUERY titles in one query. When the
+    combined content exceeds the API's result size, MediaWiki returns only
+    some revisions plus a "continue" block; follow it until every page is in.
+    """
+    params = {
+        "action": "query",
+        "prop": "revisions",
+        "rvprop": "content",
+        "rvslots": "main",
+        "titles": "|".join(titles),
+        "format": "json",
+        "formatversion": "2"
+    }
+    normalized = {}
+    content = {}
+    while True:
+        response = session.get(API_URL, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        query = data.get("query", {})
+
+        # Map requested titles through MediaWiki's title normalization
+        normalized.update((n["from"], n["to"]) for n in query.get("normalized", []))
+        for page in query.get("pages", []):
+            revisions = page.get("revisions")
+            if not page.get("missing") and revisions:
+                content[page["title"]] = revisions[0]["slots"]["main"]["content"]
+
+        if "continue" not in data:
+            break
+        params = {**params, **data["continue"]}
+    return {t: content.get(normalized.get(t, t)) for t in titles}
+
+def get_wwos_pages(titles, session=None, max_workers=4):
+    """
+    Fetches wikitext for many pages. Titles are grouped into multi-title
+    queries and the groups are requested concurrently. Returns a dict of
+    title -> wikitext (None if the page does not exist).
+    """
+    session = session or SESSION
+    chunks = [titles[i:i + TITLES_PER_QUERY] for i in range(0, len(titles), TITLES_PER_QUERY)]
+    pages = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for result in pool.map(lambda chunk: _fetch_titles(chunk, session), chunks):
+            pages.update(result)
+    return pages
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fetch WWOS (MediaWiki) page content.")
-    parser.add_argument("page_title", help="Title of the page to fetch")
+    parser.add_argument("page_title", nargs="?", help="Title of the page to fetch")
+    parser.add_argument("--batch", help="File with one page title per line to fetch together")
     args = parser.parse_args()
-    
-    get_wwos_page(args.page_title)
+
+    if args.batch:
+        try:
+            with open(args.batch, "r") as f:
+                titles = [line.strip() for line in f if line.strip()]
+            pages = get_wwos_pages(titles)
+        except (IOError, requests.exceptions.RequestException) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        missing = 0
+        for title in titles:
+            print(f"===== {title} =====")
+            if pages.get(title) is None:
+                print(f"Page '{title}' not found or no wikitext.", file=sys.stderr)
+                missing += 1
+            else:
+                print(pages[title])
+        sys.exit(1 if missing else 0)
+    elif args.page_title:
+        get_wwos_page(args.page_title)
+    else:
+        parser.error("page_title is required unless --batch is given")
@@ -23,7 +23,7 @@ Revision History:
     v1.0 (2026-06-30): Initial version. Trac #3760.
 
 Secrets:
-    token.pickle    (scripts/ local file) -- OAuth 2.0 user credentials (via google_workspace_manager.get_creds)
+    token.json      (scripts/ local file) -- OAuth 2.0 user credentials (via google_workspace_manager.get_creds)
     credentials.json (scripts/ local file) -- Google OAuth 2.0 client secrets (via google_workspace_manager.get_creds)
 
 Notes:
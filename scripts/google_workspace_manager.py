@@ -2,9 +2,9 @@
 """
 ================================================================================
 Filename:       scripts/google_workspace_manager.py
-Version:        1.31
+Version:        1.59
 Author:         Gemini CLI
-Last Modified:  2026-07-23
+Last Modified:  2026-10-16
 Context:        http://trac.gafla.us.com/ticket/3571
 
 Purpose:
@@ -19,9 +19,69 @@ Usage:
     python3 google_workspace_manager.py drive-update "file_id" --name "new_name"
     python3 google_workspace_manager.py drive-delete "file_id"
     python3 google_workspace_manager.py cal-update "event_id" --summary "New Title"
+    python3 google_workspace_manager.py cal-create-bulk events.json [--calendar ID]
     python3 google_workspace_manager.py people-create "Given" "Family" --job "Title"
+    python3 google_workspace_manager.py daemon [--socket PATH]
+    ./gwm_client.sh [--format json] gmail-list --max 5
 
 Revision History:
+    v1.59 (2026-10-16): gmail-get only decodes MIME parts until the body is found (text/plain
+                       attachments after it are no longer decoded) and replaces invalid
+                       UTF-8 instead of failing the whole message.
+    v1.58 (2026-10-16): The daemon refuses to start if its socket path answers (a daemon is
+                       already running) or is not a socket of ours, and on exit removes the
+                       socket only if it is still the one it bound.
+    v1.57 (2026-10-16): Cached credentials and API clients are rebuilt when token.json changes
+                       on disk, and a failed token refresh (RefreshError) is raised as
+                       GoogleAuthError after dropping the caches, so the MCP server and daemon
+                       recover without a restart.
+    v1.56 (2026-10-16): Only safe (GET/HEAD) API requests retry by default; writes such as
+                       messages.send or events.insert run once so a retry can't duplicate them.
+    v1.55 (2026-10-16): drive-download writes to a temp file beside output_path and renames it
+                       into place only once the download completes; an existing file is kept
+                       if the download fails.
+    v1.54 (2026-10-16): output() split into _emit_json/_emit_text selected by a dict lookup.
+    v1.53 (2026-10-16): gmail-get-by-header strips whitespace from the Message-ID up front
+                       (one list call instead of a retry) and uses precompiled header regexes.
+    v1.52 (2026-10-16): Added cal-create-bulk to insert a JSON list of events via Calendar
+                       batch requests (50 per batch).
+    v1.51 (2026-10-16): Added 'daemon' subcommand that serves CLI commands over a Unix socket
+                       (client: gwm_client.sh) so repeated calls skip start-up and auth.
+    v1.50 (2026-10-16): CLI dispatch uses per-subcommand set_defaults(handler=...) instead of an
+                       if/elif chain; gmail-send now passes --attachment as attachment_path
+                       (it was being passed positionally as cc).
+    v1.49 (2026-10-16): cal-list builds timeMin from a timezone-aware now() instead of the
+                       deprecated datetime.utcnow().
+    v1.48 (2026-10-16): API clients share one httplib2 connection pool with a 60s timeout,
+                       and requests retry 429/5xx responses with exponential backoff.
+    v1.47 (2026-10-16): gmail-download decodes slices with binascii.a2b_base64 directly.
+    v1.46 (2026-10-16): drive-download streams 8 MB chunks straight to the output file.
+    v1.45 (2026-10-16): output() serialises JSON with orjson when available (stdlib json otherwise).
+    v1.44 (2026-10-16): googleapiclient.discovery and google.oauth2 are imported on first use;
+                       the bootstrap check locates dependencies with find_spec instead of
+                       importing them.
+    v1.43 (2026-10-16): Message-ID regex for gmail-get-by-header is compiled once at module scope.
+    v1.42 (2026-10-16): gmail-get looks headers up in a dict and extracts the body and
+                       attachment list in a single walk of the MIME tree.
+    v1.41 (2026-10-16): gmail-send and gmail-create-draft share _build_raw_mime(), which
+                       serialises the MIME message into a single buffer.
+    v1.40 (2026-10-16): token.json is created with mode 0600 via os.open; token reads use
+                       EAFP instead of a separate exists() check.
+    v1.39 (2026-10-16): InstalledAppFlow, Request and MediaFileUpload are imported lazily
+                       in get_creds() and drive_upload_file().
+    v1.38 (2026-10-16): gmail-download decodes and writes attachments in 4 MB slices instead
+                       of holding the whole decoded file in memory.
+    v1.37 (2026-10-16): OAuth token stored as token.json (Credentials.to_json) instead of
+                       token.pickle; an existing token.pickle is migrated on first use.
+    v1.36 (2026-10-16): gmail-list, gmail-get, cal-list and tasks-list request partial
+                       responses (fields=) limited to the data they use.
+    v1.35 (2026-10-16): API clients are built from the bundled static discovery documents.
+    v1.34 (2026-10-16): drive-upload uses a single multipart request for files under 5 MB
+                       and 8 MB resumable chunks for larger files.
+    v1.33 (2026-10-16): Added _svc() cached service factory; credentials are loaded and
+                       each API client is built once per process.
+    v1.32 (2026-10-16): gmail-list fetches message metadata with batch requests instead
+                       of one GET per message.
     v1.31 (2026-07-23): Added drive-delete subcommand to delete a file in Google Drive.
     v1.30 (2026-07-14): Automatically extract time from tasks due date and append to notes to bypass API limitation.
     v1.29 (2026-06-30): Added fallback to gmail_get_by_header to search via From/To/Subject if Message-ID is missing.
@@ -66,7 +126,7 @@ Revision History:
     v1.0 (2026-02-16): Initial version with basic Gmail/Drive/Cal/Tasks.
 
 Secrets:
-    token.pickle (local file) - Stores OAuth 2.0 user credentials.
+    token.json (local file) - Stores OAuth 2.0 user credentials (migrated from token.pickle).
     credentials.json (local file) - Stores Google OAuth 2.0 client secrets.
 
 Notes:
@@ -76,24 +136,34 @@ Notes:
 """
 
 import datetime
+import functools
 import zoneinfo
 import os.path
 import sys
 import argparse
-import pickle
 import json
 import base64
+import binascii
 import re
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # --- BOOTSTRAP CHECK ---
 # Ensure we are running in an environment with required dependencies.
 # If not, try to re-exec with the project's .venv.
 def bootstrap():
+    # find_spec only locates the packages; importing google_auth_oauthlib here
+    # would pull in the whole OAuth flow stack on every run.
+    from importlib.util import find_spec
     try:
-        import google.auth
-        import google_auth_oauthlib
-        import googleapiclient
+        missing = any(find_spec(name) is None
+                      for name in ('google.auth', 'google_auth_oauthlib', 'googleapiclient'))
     except ImportError:
+        missing = True
+    if missing:
         script_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(script_dir)
         venv_python = os.path.join(project_root, '.venv', 'bin', 'python3')
@@ -108,13 +178,10 @@ def bootstrap():
 
 bootstrap()
 
-# Now it is safe to import Google modules
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+# Now it is safe to import Google modules. Only the lightweight HttpError is
+# imported eagerly; the discovery client, credentials, auth flow, token refresh
+# and upload helpers are imported where they are used to keep CLI startup fast.
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
 
 # Add current script's directory to sys.path to allow importing other scripts
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -147,22 +214,62 @@ SCOPES = [
 ]
 
 # Paths
-TOKEN_FILE = os.path.join(SCRIPT_DIR, 'token.pickle')
+TOKEN_FILE = os.path.join(SCRIPT_DIR, 'token.json')
+# Pre-v1.37 token store; migrated to TOKEN_FILE on first load
+LEGACY_TOKEN_FILE = os.path.join(SCRIPT_DIR, 'token.pickle')
 CREDENTIALS_FILE = os.path.join(SCRIPT_DIR, 'credentials.json')
 
+UTC = datetime.timezone.utc
+
+# Gmail accepts at most 100 calls per batch request; Calendar at most 50
+GMAIL_BATCH_SIZE = 100
+CALENDAR_BATCH_SIZE = 50
+
+# Header patterns for gmail-get-by-header (pasted raw header blocks)
+_MSGID_RE = re.compile(r'Message-ID:\s*<([^>]+)>', re.IGNORECASE)
+_FROM_RE = re.compile(r'From:\s*(.+)', re.IGNORECASE)
+_TO_RE = re.compile(r'To:\s*(.+)', re.IGNORECASE)
+_SUBJECT_RE = re.compile(r'Subject:\s*(.+)', re.IGNORECASE)
+_ANGLE_ADDR_RE = re.compile(r'<([^>]+)>')
+_WS_RE = re.compile(r'\s+')
+
 class GoogleAuthError(Exception):
     """Exception raised for authentication errors in Google Workspace Manager."""
     pass
 
-def get_creds(port=8080, use_console=False, silent_fail=False):
-    creds = None
-    if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, 'rb') as token:
+def _save_token(creds):
+    # Create the token owner-only (0600) rather than with the default umask
+    fd = os.open(TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+    os.fchmod(fd, 0o600)  # also tighten a token file that already existed
+    with os.fdopen(fd, 'w') as token:
+        token.write(creds.to_json())
+
+def _load_token():
+    """Loads stored user credentials, migrating a legacy token.pickle to JSON."""
+    from google.oauth2.credentials import Credentials
+    try:
+        # No scopes argument: keep the scopes recorded in the token so the
+        # check in get_creds() sees what was actually granted
+        return Credentials.from_authorized_user_file(TOKEN_FILE)
+    except FileNotFoundError:
+        pass
+    try:
+        with open(LEGACY_TOKEN_FILE, 'rb') as token:
+            import pickle
             creds = pickle.load(token)
+    except FileNotFoundError:
+        return None
+    _save_token(creds)
+    os.remove(LEGACY_TOKEN_FILE)
+    return creds
+
+def get_creds(port=8080, use_console=False, silent_fail=False):
+    creds = _load_token()
     
     # Check if scopes in token match current SCOPES
     if creds and set(SCOPES).issubset(set(creds.scopes)):
         if creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request
             try:
                 creds.refresh(Request())
             except Exception as e:
@@ -183,6 +290,7 @@ def get_creds(port=8080, use_console=False, silent_fail=False):
         if not use_console and os.getenv("GOOGLE_WORKSPACE_MANAGER_NON_INTERACTIVE"):
             raise GoogleAuthError("Authentication expired or revoked. Run 'python3 scripts/google_workspace_manager.py auth --console' to re-authenticate.")
 
+        from google_auth_oauthlib.flow import InstalledAppFlow
         if use_console:
             flow = InstalledAppFlow.from_client_secrets_file(
                 CREDENTIALS_FILE, SCOPES, redirect_uri='urn:ietf:wg:oauth:2.0:oob')
@@ -198,35 +306,182 @@ def get_creds(port=8080, use_console=False, silent_fail=False):
             except Exception as e:
                 raise GoogleAuthError(f"Failed to start local auth server: {e}. Use --console for headless environments.")
         
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+        _save_token(creds)
     return creds
 
-def output(data, format='text'):
-    if format == 'json':
-        print(json.dumps(data, indent=2))
+# Partial-response field masks for read paths; only what callers use is fetched.
+# Message payloads keep all sub-fields since MIME parts nest arbitrarily deep.
+GMAIL_LIST_FIELDS = 'id,snippet,internalDate'
+GMAIL_MESSAGE_FIELDS = 'id,snippet,internalDate,payload'
+CALENDAR_LIST_FIELDS = 'items(id,summary,description,location,start,end,status,htmlLink,attendees(email,responseStatus))'
+TASKS_LIST_FIELDS = 'items(id,title,status,due,notes,parent,updated,completed)'
+
+# Base64 characters decoded per write in gmail_download_attachment (multiple of 4)
+ATTACHMENT_DECODE_CHUNK = 4 * 1024 * 1024
+# Maps the URL-safe base64 alphabet Gmail uses onto the standard one
+_URLSAFE_B64_TO_STD = str.maketrans('-_', '+/')
+
+# Files below this size are uploaded in one multipart request; larger files
+# use a resumable upload sent in UPLOAD_CHUNK_SIZE pieces
+SIMPLE_UPLOAD_MAX = 5 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+def _token_mtime():
+    try:
+        return os.stat(TOKEN_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+# token.json's mtime when the cached credentials were loaded
+_cached_token_mtime = None
+
+@functools.lru_cache(maxsize=1)
+def _get_creds_cached():
+    """Loads (and if needed refreshes) credentials once per token.json version."""
+    global _cached_token_mtime
+    creds = get_creds()
+    _cached_token_mtime = _token_mtime()
+    return creds
+
+def _auth_failed(error):
+    """Drops the cached clients and turns a token refresh failure into GoogleAuthError."""
+    _reset_service_cache()
+    return GoogleAuthError(f"Refreshing credentials failed ({error}). Run 'python3 scripts/google_workspace_manager.py auth --console' to re-authenticate.")
+
+def _run_batch(batch):
+    """Executes a batch request; batches refresh credentials outside AuthorizedHttp."""
+    from google.auth.exceptions import RefreshError
+    try:
+        batch.execute()
+    except RefreshError as e:
+        raise _auth_failed(e) from e
+
+# Network timeout (seconds) and retry count for Google API calls. Retries use
+# googleapiclient's built-in exponential backoff on 429/5xx responses and are
+# only applied to safe methods: a retried POST whose first attempt committed
+# server-side would send a second email or create a second event/file.
+API_TIMEOUT = 60
+API_NUM_RETRIES = 4
+API_RETRY_METHODS = frozenset({'GET', 'HEAD'})
+
+@functools.lru_cache(maxsize=1)
+def _shared_http():
+    """One httplib2 connection pool shared by every API client."""
+    import httplib2
+    return httplib2.Http(timeout=API_TIMEOUT)
+
+@functools.lru_cache(maxsize=1)
+def _request_builder():
+    """HttpRequest subclass whose execute() retries safe methods by default."""
+    from googleapiclient.http import HttpRequest
+
+    class RetryingHttpRequest(HttpRequest):
+        def execute(self, http=None, num_retries=None):
+            if num_retries is None:
+                num_retries = API_NUM_RETRIES if self.method.upper() in API_RETRY_METHODS else 0
+            return super().execute(http=http, num_retries=num_retries)
+
+    return RetryingHttpRequest
+
+@functools.lru_cache(maxsize=1)
+def _authorized_http_class():
+    """AuthorizedHttp subclass that reports refresh failures as GoogleAuthError."""
+    import google_auth_httplib2
+    from google.auth.exceptions import RefreshError
+
+    class CheckedAuthorizedHttp(google_auth_httplib2.AuthorizedHttp):
+        def request(self, *args, **kwargs):
+            try:
+                return super().request(*args, **kwargs)
+            except RefreshError as e:
+                raise _auth_failed(e) from e
+
+    return CheckedAuthorizedHttp
+
+def _svc(name, version):
+    """Returns a cached API client so repeated calls in one process (e.g. the
+    MCP server) skip re-reading the token and re-building the service.
+    The caches are dropped when token.json has changed since it was loaded
+    (re-authorised or replaced by another process)."""
+    if _get_creds_cached.cache_info().currsize and _token_mtime() != _cached_token_mtime:
+        _reset_service_cache()
+    return _build_svc(name, version)
+
+@functools.lru_cache(maxsize=None)
+def _build_svc(name, version):
+    """Builds an API client from the discovery document shipped with
+    googleapiclient rather than fetching it over the network."""
+    from googleapiclient.discovery import build
+    http = _authorized_http_class()(_get_creds_cached(), http=_shared_http())
+    return build(name, version, http=http, requestBuilder=_request_builder(),
+                 static_discovery=True, cache_discovery=False)
+
+def _reset_service_cache():
+    """Drops cached credentials and clients, e.g. after re-authenticating."""
+    _build_svc.cache_clear()
+    _get_creds_cached.cache_clear()
+    _shared_http.cache_clear()
+
+def _dumps(data):
+    """Pretty-prints data as JSON, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, indent=2)
+
+def _emit_json(data):
+    print(_dumps(data))
+
+def _emit_text(data):
+    if isinstance(data, dict):
+        print(_dumps(data))
+    elif isinstance(data, list):
+        for item in data:
+            print(item)
     else:
-        if isinstance(data, dict):
-            print(json.dumps(data, indent=2))
-        elif isinstance(data, list):
-            for item in data:
-                print(item)
-        else:
-            print(data)
+        print(data)
+
+_EMITTERS = {'json': _emit_json, 'text': _emit_text}
+
+def output(data, format='text'):
+    # Command functions (and the MCP server) pass the format per call, so
+    # pick the emitter with one dict lookup; unknown formats print as text.
+    _EMITTERS.get(format, _emit_text)(data)
 
 # --- GMAIL FUNCTIONS ---
 
 def gmail_list_messages(query='', max_results=10, output_format='text', cite=False):
-    creds = get_creds()
-    service = build('gmail', 'v1', credentials=creds)
+    service = _svc('gmail', 'v1')
     try:
         results = service.users().messages().list(userId='me', q=query, maxResults=max_results).execute()
         messages = results.get('messages', [])
         
+        # Fetch all message metadata in batched requests instead of one GET per message
+        fetched = {}
+        errors = []
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                errors.append(exception)
+            else:
+                fetched[request_id] = response
+
+        for start in range(0, len(messages), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for msg in messages[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(service.users().messages().get(userId='me', id=msg['id'], format='minimal',
+                                                         fields=GMAIL_LIST_FIELDS),
+                          request_id=msg['id'])
+            _run_batch(batch)
+        if errors and not fetched:
+            raise errors[0]
+
+        from datetime import datetime, timezone
         full_messages = []
         for msg in messages:
-            m = service.users().messages().get(userId='me', id=msg['id'], format='minimal').execute()
-            from datetime import datetime, timezone
+            m = fetched.get(msg['id'])
+            if m is None:
+                continue
             ts_ms = int(m.get('internalDate', 0))
             dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
             msg_data = {
@@ -244,33 +499,44 @@ def gmail_list_messages(query='', max_results=10, output_format='text', cite=Fal
     except HttpError as error:
         output({'error': str(error)}, output_format)
 
+def _build_raw_mime(to, subject, body, cc=None, attachment_path=None):
+    """
+    Builds the base64url 'raw' payload for gmail send / draft create.
+    The attachment is read straight into the message and the MIME tree is
+    serialised into one buffer, avoiding the extra as_bytes() copy.
+    """
+    from email.generator import BytesGenerator
+    from email.message import EmailMessage
+    import io
+    import mimetypes
+    message = EmailMessage()
+    body = body.replace('\\n', '\n')
+    message.set_content(body)
+    message['To'] = to
+    message['Subject'] = subject
+    if cc:
+        message['Cc'] = cc
+
+    if attachment_path and os.path.exists(attachment_path):
+        mime_type, _ = mimetypes.guess_type(attachment_path)
+        if mime_type is None:
+            mime_type = 'application/octet-stream'
+        main_type, sub_type = mime_type.split('/', 1)
+
+        with open(attachment_path, 'rb') as fp:
+            message.add_attachment(fp.read(), maintype=main_type, subtype=sub_type, filename=os.path.basename(attachment_path))
+
+    buf = io.BytesIO()
+    BytesGenerator(buf, mangle_from_=False, policy=message.policy).flatten(message)
+    del message
+    with buf.getbuffer() as raw:
+        return base64.urlsafe_b64encode(raw).decode()
+
 def gmail_send_message(to, subject, body, cc=None, attachment_path=None, output_format='text'):
-    creds = get_creds()
-    service = build('gmail', 'v1', credentials=creds)
+    service = _svc('gmail', 'v1')
     try:
-        from email.message import EmailMessage
-        import mimetypes
-        message = EmailMessage()
-        body = body.replace('\\n', '\n')
-        message.set_content(body)
-        message['To'] = to
-        message['Subject'] = subject
-        if cc:
-            message['Cc'] = cc
-        
-        if attachment_path and os.path.exists(attachment_path):
-            mime_type, _ = mimetypes.guess_type(attachment_path)
-            if mime_type is None:
-                mime_type = 'application/octet-stream'
-            main_type, sub_type = mime_type.split('/', 1)
-            
-            with open(attachment_path, 'rb') as fp:
-                attachment_data = fp.read()
-                message.add_attachment(attachment_data, maintype=main_type, subtype=sub_type, filename=os.path.basename(attachment_path))
-
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
         create_message = {
-            'raw': encoded_message
+            'raw': _build_raw_mime(to, subject, body, cc, attachment_path)
         }
         send_message = service.users().messages().send(userId="me", body=create_message).execute()
         output(send_message, output_format)
@@ -278,33 +544,11 @@ def gmail_send_message(to, subject, body, cc=None, attachment_path=None, output_
         output({'error': str(error)}, output_format)
 
 def gmail_create_draft(to, subject, body, cc=None, attachment_path=None, output_format='text'):
-    creds = get_creds()
-    service = build('gmail', 'v1', credentials=creds)
+    service = _svc('gmail', 'v1')
     try:
-        from email.message import EmailMessage
-        import mimetypes
-        message = EmailMessage()
-        body = body.replace('\\n', '\n')
-        message.set_content(body)
-        message['To'] = to
-        message['Subject'] = subject
-        if cc:
-            message['Cc'] = cc
-
-        if attachment_path and os.path.exists(attachment_path):
-            mime_type, _ = mimetypes.guess_type(attachment_path)
-            if mime_type is None:
-                mime_type = 'application/octet-stream'
-            main_type, sub_type = mime_type.split('/', 1)
-            
-            with open(attachment_path, 'rb') as fp:
-                attachment_data = fp.read()
-                message.add_attachment(attachment_data, maintype=main_type, subtype=sub_type, filename=os.path.basename(attachment_path))
-        
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
         create_draft = {
             'message': {
-                'raw': encoded_message
+                'raw': _build_raw_mime(to, subject, body, cc, attachment_path)
             }
         }
         draft = service.users().drafts().create(userId="me", body=create_draft).execute()
@@ -313,25 +557,24 @@ def gmail_create_draft(to, subject, body, cc=None, attachment_path=None, output_
         output({'error': str(error)}, output_format)
 
 def gmail_get_by_header(header_string, output_format='text'):
-    creds = get_creds()
-    service = build('gmail', 'v1', credentials=creds)
+    service = _svc('gmail', 'v1')
     try:
-        match = re.search(r'Message-ID:\s*<([^>]+)>', header_string, re.IGNORECASE)
+        match = _MSGID_RE.search(header_string)
         if not match:
-            from_match = re.search(r'From:\s*(.+)', header_string, re.IGNORECASE)
-            to_match = re.search(r'To:\s*(.+)', header_string, re.IGNORECASE)
-            subject_match = re.search(r'Subject:\s*(.+)', header_string, re.IGNORECASE)
+            from_match = _FROM_RE.search(header_string)
+            to_match = _TO_RE.search(header_string)
+            subject_match = _SUBJECT_RE.search(header_string)
             
             query_parts = []
             if from_match:
                 from_addr = from_match.group(1).strip()
-                email_match = re.search(r'<([^>]+)>', from_addr)
+                email_match = _ANGLE_ADDR_RE.search(from_addr)
                 if email_match:
                     from_addr = email_match.group(1)
                 query_parts.append(f'from:{from_addr}')
             if to_match:
                 to_addr = to_match.group(1).strip()
-                email_match = re.search(r'<([^>]+)>', to_addr)
+                email_match = _ANGLE_ADDR_RE.search(to_addr)
                 if email_match:
                     to_addr = email_match.group(1)
                 query_parts.append(f'to:{to_addr}')
@@ -356,22 +599,17 @@ def gmail_get_by_header(header_string, output_format='text'):
             gmail_get_message(gmail_id, output_format)
             return
 
-        msg_id_header = match.group(1).strip()
+        # A Message-ID never contains whitespace; any found here comes from
+        # line folding or copy/paste, so strip it before the single lookup
+        msg_id_header = _WS_RE.sub('', match.group(1))
         query = f'rfc822msgid:{msg_id_header}'
         
         results = service.users().messages().list(userId='me', q=query).execute()
         messages = results.get('messages', [])
         
         if not messages:
-            clean_msg_id = msg_id_header.replace(' ', '')
-            if clean_msg_id != msg_id_header:
-                query = f'rfc822msgid:{clean_msg_id}'
-                results = service.users().messages().list(userId='me', q=query).execute()
-                messages = results.get('messages', [])
-
-            if not messages:
-                output({'error': f'No message found for Message-ID: {msg_id_header}'}, output_format)
-                return
+            output({'error': f'No message found for Message-ID: {msg_id_header}'}, output_format)
+            return
         
         gmail_id = messages[0]['id']
         gmail_get_message(gmail_id, output_format)
@@ -379,49 +617,48 @@ def gmail_get_by_header(header_string, output_format='text'):
         output({'error': str(error)}, output_format)
 
 def gmail_get_message(message_id, output_format='text', cite=False):
-    creds = get_creds()
-    service = build('gmail', 'v1', credentials=creds)
+    service = _svc('gmail', 'v1')
     try:
-        message = service.users().messages().get(userId='me', id=message_id).execute()
+        message = service.users().messages().get(userId='me', id=message_id,
+                                                 fields=GMAIL_MESSAGE_FIELDS).execute()
         headers = message['payload'].get('headers', [])
-        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
-        from_email = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown')
-        
-        def get_body(payload):
-            if payload.get('mimeType') == 'text/plain':
-                data = payload['body'].get('data')
-                if data:
-                    return base64.urlsafe_b64decode(data).decode()
-            
-            if 'parts' in payload:
-                for part in payload['parts']:
-                    body = get_body(part)
-                    if body:
-                        return body
-            
-            if payload.get('mimeType') == 'text/html':
-                data = payload['body'].get('data')
-                if data:
-                    html = base64.urlsafe_b64decode(data).decode()
-                    return re.sub('<[^<]+?>', '', html)
-            return ""
-
-        body = get_body(message['payload'])
-
-        def get_attachments(payload):
-            attachments = []
-            if 'parts' in payload:
-                for part in payload['parts']:
-                    attachments.extend(get_attachments(part))
-            if 'attachmentId' in payload.get('body', {}):
+        # Reversed so the first occurrence of a repeated header wins
+        hmap = {h['name'].lower(): h['value'] for h in reversed(headers)}
+        subject = hmap.get('subject', 'No Subject')
+        from_email = hmap.get('from', 'Unknown')
+
+        attachments = []
+
+        def walk(payload, want_body=True):
+            """
+            Single pass over the MIME tree: collects attachment metadata and
+            returns the first text/plain body (or tag-stripped text/html).
+            Once a body is found, later parts are only scanned for attachments.
+            """
+            mime_type = payload.get('mimeType')
+            part_body = payload.get('body', {})
+            body = ""
+            if want_body and mime_type == 'text/plain' and part_body.get('data'):
+                body = base64.urlsafe_b64decode(part_body['data']).decode(errors='replace')
+
+            for part in payload.get('parts', []):
+                part_text = walk(part, want_body and not body)
+                if not body:
+                    body = part_text
+
+            if want_body and not body and mime_type == 'text/html' and part_body.get('data'):
+                html = base64.urlsafe_b64decode(part_body['data']).decode(errors='replace')
+                body = re.sub('<[^<]+?>', '', html)
+
+            if 'attachmentId' in part_body:
                 attachments.append({
-                    'id': payload['body']['attachmentId'],
+                    'id': part_body['attachmentId'],
                     'filename': payload.get('filename', 'unknown'),
                     'mimeType': payload.get('mimeType', 'application/octet-stream')
                 })
-            return attachments
+            return body
 
-        attachments = get_attachments(message['payload'])
+        body = walk(message['payload'])
 
         result = {
             'id': message['id'],
@@ -440,13 +677,11 @@ def gmail_get_message(message_id, output_format='text', cite=False):
         output({'error': str(error)}, output_format)
 
 def gmail_download_attachment(message_id, attachment_id, filename, output_dir=None):
-    creds = get_creds()
-    service = build('gmail', 'v1', credentials=creds)
+    service = _svc('gmail', 'v1')
     try:
         attachment = service.users().messages().attachments().get(
             userId='me', messageId=message_id, id=attachment_id).execute()
-        data = attachment['data']
-        file_data = base64.urlsafe_b64decode(data.encode('UTF-8'))
+        data = attachment.pop('data')
         
         if output_dir:
             if not os.path.exists(output_dir):
@@ -455,8 +690,11 @@ def gmail_download_attachment(message_id, attachment_id, filename, output_dir=No
         else:
             path = filename
 
+        # Decode in slices so only one decoded chunk is held in memory at a time
         with open(path, 'wb') as f:
-            f.write(file_data)
+            for start in range(0, len(data), ATTACHMENT_DECODE_CHUNK):
+                chunk = data[start:start + ATTACHMENT_DECODE_CHUNK].translate(_URLSAFE_B64_TO_STD)
+                f.write(binascii.a2b_base64(chunk + '=' * (-len(chunk) % 4)))
         return path
     except HttpError as error:
         print(f"Error downloading attachment: {error}")
@@ -467,8 +705,7 @@ def gmail_modify_labels(message_id, add_labels=None, remove_labels=None, output_
         add_labels = []
     if remove_labels is None:
         remove_labels = []
-    creds = get_creds()
-    service = build('gmail', 'v1', credentials=creds)
+    service = _svc('gmail', 'v1')
     try:
         # Resolve human-readable label names to label IDs
         labels_resp = service.users().labels().list(userId='me').execute()
@@ -507,35 +744,49 @@ def gmail_modify_labels(message_id, add_labels=None, remove_labels=None, output_
 # --- DRIVE FUNCTIONS ---
 
 def drive_download_file(file_id, output_path, output_format='text'):
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    import tempfile
+    from googleapiclient.http import MediaIoBaseDownload
+    service = _svc('drive', 'v3')
+    # Chunks stream into a temp file in the target directory, which replaces
+    # output_path only once complete; a failed download leaves it untouched
+    fh = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(output_path)),
+                                     prefix='.drive-download-', delete=False)
     try:
-        from googleapiclient.http import MediaIoBaseDownload
-        import io
-        request = service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
-        
-        with open(output_path, 'wb') as f:
-            f.write(fh.getvalue())
-        output({'result': f'Downloaded to {output_path}'}, output_format)
-    except HttpError as error:
+        with fh:
+            request = service.files().get_media(fileId=file_id)
+            downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+            done = False
+            while done is False:
+                status, done = downloader.next_chunk()
+        os.replace(fh.name, output_path)
+    except BaseException as error:
+        os.unlink(fh.name)
+        if not isinstance(error, HttpError):
+            raise
         output({'error': str(error)}, output_format)
+        return
+    output({'result': f'Downloaded to {output_path}'}, output_format)
 
 def drive_upload_file(file_path, mimetype=None, parent_id=None, target_mimetype=None, output_format='text'):
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         file_metadata = {'name': os.path.basename(file_path)}
         if parent_id:
             file_metadata['parents'] = [parent_id]
         if target_mimetype:
             file_metadata['mimeType'] = target_mimetype
-        media = MediaFileUpload(file_path, mimetype=mimetype, resumable=True)
-        file = service.files().create(body=file_metadata, media_body=media, fields='id, name').execute()
+        from googleapiclient.http import MediaFileUpload
+        if os.path.getsize(file_path) < SIMPLE_UPLOAD_MAX:
+            # Small files go up in a single multipart request
+            media = MediaFileUpload(file_path, mimetype=mimetype, resumable=False)
+            file = service.files().create(body=file_metadata, media_body=media, fields='id, name').execute()
+        else:
+            media = MediaFileUpload(file_path, mimetype=mimetype, resumable=True,
+                                    chunksize=UPLOAD_CHUNK_SIZE)
+            request = service.files().create(body=file_metadata, media_body=media, fields='id, name')
+            file = None
+            while file is None:
+                _, file = request.next_chunk()
         output(file, output_format)
         return file
     except HttpError as error:
@@ -543,8 +794,7 @@ def drive_upload_file(file_path, mimetype=None, parent_id=None, target_mimetype=
         return None
 
 def drive_update_file(file_id, name=None, description=None, parent_id=None, output_format='text'):
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         file_metadata = {}
         if name:
@@ -574,8 +824,7 @@ def drive_update_file(file_id, name=None, description=None, parent_id=None, outp
         return None
 
 def drive_delete_file(file_id, output_format='text'):
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         service.files().delete(fileId=file_id).execute()
         if output_format == 'json':
@@ -589,8 +838,7 @@ def drive_delete_file(file_id, output_format='text'):
             print(f"Error deleting file: {e}", file=sys.stderr)
 
 def drive_search(query=None, max_results=10, output_format='text', cite=False):
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         results = service.files().list(
             q=query, pageSize=max_results, fields="nextPageToken, files(id, name, mimeType, webViewLink)").execute()
@@ -603,8 +851,7 @@ def drive_search(query=None, max_results=10, output_format='text', cite=False):
         output({'error': str(error)}, output_format)
 
 def drive_get_file_metadata(file_id, output_format='text', cite=False):
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         file = service.files().get(fileId=file_id, fields='id, name, mimeType, description, webViewLink').execute()
         if cite:
@@ -615,8 +862,7 @@ def drive_get_file_metadata(file_id, output_format='text', cite=False):
 
 def drive_create_folder(name, parent_id=None, output_format='text'):
     """Create a folder in Google Drive. Returns existing folder if one with the same name already exists in the parent."""
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         # Check if folder already exists in the parent
         query = f"name = '{name}' and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
@@ -641,8 +887,7 @@ def drive_create_folder(name, parent_id=None, output_format='text'):
 
 def drive_create_shortcut(target_id, parent_id, name=None, output_format='text'):
     """Create a shortcut to a Drive file/folder inside a specified parent folder."""
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         # Resolve name from target if not provided
         if not name:
@@ -660,8 +905,7 @@ def drive_create_shortcut(target_id, parent_id, name=None, output_format='text')
         output({'error': str(error)}, output_format)
 
 def drive_export_file(file_id, mime_type='text/plain', output_file=None):
-    creds = get_creds()
-    service = build('drive', 'v3', credentials=creds)
+    service = _svc('drive', 'v3')
     try:
         request = service.files().export_media(fileId=file_id, mimeType=mime_type)
         file_data = request.execute()
@@ -681,8 +925,7 @@ def drive_export_file(file_id, mime_type='text/plain', output_file=None):
 # --- SHEETS FUNCTIONS ---
 
 def sheets_update_row(spreadsheet_id, range_name, values, output_format='text'):
-    creds = get_creds()
-    service = build('sheets', 'v4', credentials=creds)
+    service = _svc('sheets', 'v4')
     try:
         body = {'values': values}
         result = service.spreadsheets().values().update(
@@ -702,21 +945,19 @@ def sheets_update_row(spreadsheet_id, range_name, values, output_format='text'):
 # --- CALENDAR FUNCTIONS ---
 
 def calendar_list_events(max_results=10, output_format='text', calendar_id='primary'):
-    creds = get_creds()
-    service = build('calendar', 'v3', credentials=creds)
+    service = _svc('calendar', 'v3')
     try:
-        now = datetime.datetime.utcnow().isoformat() + 'Z'
+        now = datetime.datetime.now(UTC).isoformat().replace('+00:00', 'Z')
         results = service.events().list(calendarId=calendar_id, timeMin=now,
                                         maxResults=max_results, singleEvents=True,
-                                        orderBy='startTime').execute()
+                                        orderBy='startTime', fields=CALENDAR_LIST_FIELDS).execute()
         events = results.get('items', [])
         output(events, output_format)
     except HttpError as error:
         output({'error': str(error)}, output_format)
 
 def calendar_create_event(summary, start_time_str, duration_mins=60, description=None, location=None, attendees=None, all_day=False, output_format='text', calendar_id='primary'):
-    creds = get_creds()
-    service = build('calendar', 'v3', credentials=creds)
+    service = _svc('calendar', 'v3')
     try:
         if all_day:
             try:
@@ -760,9 +1001,48 @@ def calendar_create_event(summary, start_time_str, duration_mins=60, description
     except Exception as error:
         output({'error': str(error)}, output_format)
 
+def calendar_create_events_bulk(events_json_path, output_format='text', calendar_id='primary'):
+    """
+    Creates many events from a JSON list of Calendar event resources
+    ('-' reads stdin). Inserts are sent as batch requests of
+    CALENDAR_BATCH_SIZE; results (event or error) are output in input order.
+    """
+    service = _svc('calendar', 'v3')
+    try:
+        if events_json_path == '-':
+            events = json.load(sys.stdin)
+        else:
+            with open(events_json_path, 'r') as f:
+                events = json.load(f)
+        if not isinstance(events, list):
+            raise ValueError("expected a JSON list of events")
+    except (OSError, ValueError) as error:
+        output({'error': f"Could not read events: {error}"}, output_format)
+        return
+
+    results = [None] * len(events)
+
+    def collect(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            results[index] = {'error': str(exception)}
+        else:
+            results[index] = {'id': response.get('id'), 'summary': response.get('summary'),
+                              'htmlLink': response.get('htmlLink')}
+
+    try:
+        for start in range(0, len(events), CALENDAR_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for index in range(start, min(start + CALENDAR_BATCH_SIZE, len(events))):
+                batch.add(service.events().insert(calendarId=calendar_id, body=events[index]),
+                          request_id=str(index))
+            _run_batch(batch)
+        output(results, output_format)
+    except HttpError as error:
+        output({'error': str(error)}, output_format)
+
 def calendar_update_event(event_id, summary=None, start_time_str=None, duration_mins=None, description=None, location=None, attendees=None, all_day=None, output_format='text', calendar_id='primary'):
-    creds = get_creds()
-    service = build('calendar', 'v3', credentials=creds)
+    service = _svc('calendar', 'v3')
     try:
         event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
         
@@ -838,8 +1118,7 @@ def calendar_update_event(event_id, summary=None, start_time_str=None, duration_
         output({'error': str(error)}, output_format)
 
 def calendar_get_event(event_id, output_format='text', calendar_id='primary'):
-    creds = get_creds()
-    service = build('calendar', 'v3', credentials=creds)
+    service = _svc('calendar', 'v3')
     try:
         event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
         output(event, output_format)
@@ -847,8 +1126,7 @@ def calendar_get_event(event_id, output_format='text', calendar_id='primary'):
         output({'error': str(error)}, output_format)
 
 def calendar_delete_event(event_id, output_format='text', calendar_id='primary'):
-    creds = get_creds()
-    service = build('calendar', 'v3', credentials=creds)
+    service = _svc('calendar', 'v3')
     try:
         service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
         output({'result': f'Event {event_id} deleted'}, output_format)
@@ -858,18 +1136,17 @@ def calendar_delete_event(event_id, output_format='text', calendar_id='primary')
 # --- TASKS FUNCTIONS ---
 
 def tasks_list_tasks(max_results=10, output_format='text'):
-    creds = get_creds()
-    service = build('tasks', 'v1', credentials=creds)
+    service = _svc('tasks', 'v1')
     try:
-        results = service.tasks().list(tasklist='@default', maxResults=max_results).execute()
+        results = service.tasks().list(tasklist='@default', maxResults=max_results,
+                                       fields=TASKS_LIST_FIELDS).execute()
         tasks = results.get('items', [])
         output(tasks, output_format)
     except HttpError as error:
         output({'error': str(error)}, output_format)
 
 def tasks_create_task(title, notes=None, due_date_str=None, output_format='text'):
-    creds = get_creds()
-    service = build('tasks', 'v1', credentials=creds)
+    service = _svc('tasks', 'v1')
     try:
         task = {
             'title': title,
@@ -894,8 +1171,7 @@ def tasks_create_task(title, notes=None, due_date_str=None, output_format='text'
         output({'error': str(error)}, output_format)
 
 def tasks_update_task(task_id, title=None, notes=None, due_date_str=None, output_format='text'):
-    creds = get_creds()
-    service = build('tasks', 'v1', credentials=creds)
+    service = _svc('tasks', 'v1')
     try:
         task = service.tasks().get(tasklist='@default', task=task_id).execute()
         if title:
@@ -925,8 +1201,7 @@ def tasks_update_task(task_id, title=None, notes=None, due_date_str=None, output
 # --- CONTACTS FUNCTIONS ---
 
 def contacts_create_contact(given_name, family_name, job_title=None, company=None, phone=None, email=None, notes=None, output_format='text'):
-    creds = get_creds()
-    service = build('people', 'v1', credentials=creds)
+    service = _svc('people', 'v1')
     try:
         contact_body = {
             "names": [{"givenName": given_name, "familyName": family_name}],
@@ -951,7 +1226,124 @@ def contacts_create_contact(given_name, family_name, job_title=None, company=Non
 
 # --- MAIN CLI ---
 
-if __name__ == '__main__':
+# Unix socket used by the 'daemon' subcommand and gwm_client.sh
+DAEMON_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'), f'gwm.{os.getuid()}.sock')
+
+# --- CLI HANDLERS ---
+# Subcommands that need more than a single call; the rest are inline lambdas
+# registered with set_defaults(handler=...) on their subparser.
+
+def _cmd_auth(args):
+    get_creds(port=args.port, use_console=args.console)
+    _reset_service_cache()
+    print("Authentication verified.")
+
+def _cmd_gmail_download(args):
+    path = gmail_download_attachment(args.msg_id, args.att_id, args.filename, args.out)
+    if path:
+        print(f"Attachment saved to {path}")
+
+def _cmd_cal_update(args):
+    all_day_bool = None
+    if args.all_day == 'true': all_day_bool = True
+    elif args.all_day == 'false': all_day_bool = False
+    calendar_update_event(args.id, args.summary, args.start, args.duration, args.desc, args.location, args.attendees, all_day_bool, args.format, args.calendar)
+
+def _claim_socket_path(socket_path):
+    """
+    Removes a stale socket left at socket_path by a daemon that was killed.
+    Raises RuntimeError if a daemon is still listening there, or if the path
+    is not a socket owned by us (the /tmp fallback is shared with other users).
+    """
+    import socket
+    import stat
+
+    try:
+        st = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise RuntimeError(f"{socket_path} exists and is not a socket owned by this user")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.remove(socket_path)
+    else:
+        raise RuntimeError(f"a daemon is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+def serve_daemon(socket_path=None):
+    """
+    Runs commands sent over a Unix socket in this process, so credentials,
+    API clients and their connections stay warm between calls. Each
+    connection sends one JSON-encoded argv list terminated by a newline and
+    receives the command's output; see gwm_client.sh.
+    """
+    import contextlib
+    import socket
+
+    socket_path = socket_path or DAEMON_SOCKET
+    # Expired credentials must raise rather than wait on a browser or prompt
+    os.environ['GOOGLE_WORKSPACE_MANAGER_NON_INTERACTIVE'] = '1'
+    parser = build_parser()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket is owner-only (0600)
+    try:
+        _claim_socket_path(socket_path)
+        server.bind(socket_path)
+    except (OSError, RuntimeError) as e:
+        server.close()
+        print(f"Error: cannot listen on {socket_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        os.umask(old_umask)
+    # Remembered so shutdown never removes a socket another daemon bound since
+    bound = os.lstat(socket_path)
+    server.listen(8)
+    print(f"google_workspace_manager daemon listening on {socket_path}", file=sys.stderr)
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            try:
+                with conn, conn.makefile('rw', encoding='utf-8') as stream:
+                    with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream):
+                        try:
+                            argv = json.loads(stream.readline())
+                            if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                                raise ValueError("expected a JSON list of arguments")
+                            args = parser.parse_args(argv)
+                            if args.command in ('auth', 'daemon'):
+                                print(f"Error: '{args.command}' cannot be run through the daemon.")
+                            else:
+                                args.handler(args)
+                        except SystemExit:
+                            # argparse --help or usage error; the message was already written
+                            pass
+                        except GoogleAuthError as e:
+                            _reset_service_cache()
+                            print(f"Error: {e}")
+                        except Exception as e:
+                            print(f"Error: {e}")
+            except OSError:
+                # The client went away before reading its output (or was only
+                # checking whether a daemon is listening)
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            st = os.lstat(socket_path)
+            if (st.st_dev, st.st_ino) == (bound.st_dev, bound.st_ino):
+                os.remove(socket_path)
+        except OSError:
+            pass
+
+def build_parser():
     parser = argparse.ArgumentParser(description='Google Workspace Unified Manager')
     parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
     subparsers = parser.add_subparsers(dest='command', required=True)
@@ -959,6 +1351,7 @@ if __name__ == '__main__':
     parser_auth = subparsers.add_parser('auth', help='Refresh or establish authentication')
     parser_auth.add_argument('--port', type=int, default=8080, help='Port for local server auth (default: 8080)')
     parser_auth.add_argument('--console', action='store_true', help='Use console-based auth flow (for headless servers)')
+    parser_auth.set_defaults(handler=_cmd_auth)
 
     parser_people_create = subparsers.add_parser('people-create', help='Create a Google Contact')
     parser_people_create.add_argument('given_name', help='Given name')
@@ -968,17 +1361,20 @@ if __name__ == '__main__':
     parser_people_create.add_argument('--phone', help='Phone number')
     parser_people_create.add_argument('--email', help='Email address')
     parser_people_create.add_argument('--notes', help='Notes or biography')
+    parser_people_create.set_defaults(handler=lambda a: contacts_create_contact(a.given_name, a.family_name, a.job, a.company, a.phone, a.email, a.notes, a.format))
 
     parser_gmail_list = subparsers.add_parser('gmail-list', help='List Gmail messages')
     parser_gmail_list.add_argument('--query', default='', help='Gmail search query')
     parser_gmail_list.add_argument('--max', type=int, default=10, help='Max results')
     parser_gmail_list.add_argument('--cite', action='store_true', help='Generate WWOS-style citation')
+    parser_gmail_list.set_defaults(handler=lambda a: gmail_list_messages(a.query, a.max, a.format, a.cite))
 
     parser_gmail_send = subparsers.add_parser('gmail-send', help='Send a Gmail message')
     parser_gmail_send.add_argument('to', help='Recipient email address')
     parser_gmail_send.add_argument('subject', help='Email subject')
     parser_gmail_send.add_argument('body', help='Email body')
     parser_gmail_send.add_argument('--attachment', help='Path to file to attach')
+    parser_gmail_send.set_defaults(handler=lambda a: gmail_send_message(a.to, a.subject, a.body, attachment_path=a.attachment, output_format=a.format))
 
     parser_gmail_draft = subparsers.add_parser('gmail-create-draft', help='Create a Gmail draft')
     parser_gmail_draft.add_argument('to', help='Recipient email address')
@@ -986,62 +1382,74 @@ if __name__ == '__main__':
     parser_gmail_draft.add_argument('body', help='Email body')
     parser_gmail_draft.add_argument('--cc', help='CC recipients (comma-separated)')
     parser_gmail_draft.add_argument('--attachment', help='Path to file to attach')
+    parser_gmail_draft.set_defaults(handler=lambda a: gmail_create_draft(a.to, a.subject, a.body, cc=a.cc, attachment_path=a.attachment, output_format=a.format))
 
     parser_gmail_get = subparsers.add_parser('gmail-get', help='Get message details')
     parser_gmail_get.add_argument('id', help='Message ID')
     parser_gmail_get.add_argument('--cite', action='store_true', help='Generate WWOS-style citation')
+    parser_gmail_get.set_defaults(handler=lambda a: gmail_get_message(a.id, a.format, a.cite))
 
     parser_gmail_download = subparsers.add_parser('gmail-download', help='Download Gmail attachment')
     parser_gmail_download.add_argument('msg_id', help='Message ID')
     parser_gmail_download.add_argument('att_id', help='Attachment ID')
     parser_gmail_download.add_argument('filename', help='Filename')
     parser_gmail_download.add_argument('--out', help='Output directory')
+    parser_gmail_download.set_defaults(handler=_cmd_gmail_download)
 
     parser_gmail_header = subparsers.add_parser('gmail-get-by-header', help='Get message details by header string')
     parser_gmail_header.add_argument('header', help='Full email header string')
+    parser_gmail_header.set_defaults(handler=lambda a: gmail_get_by_header(a.header, a.format))
 
     parser_gmail_modify = subparsers.add_parser('gmail-modify-labels', help='Modify labels on a Gmail message')
     parser_gmail_modify.add_argument('id', help='Message ID')
     parser_gmail_modify.add_argument('--add', nargs='*', default=[], help='Label names or IDs to add')
     parser_gmail_modify.add_argument('--remove', nargs='*', default=[], help='Label names or IDs to remove')
-
+    parser_gmail_modify.set_defaults(handler=lambda a: gmail_modify_labels(a.id, a.add, a.remove, a.format))
 
     parser_drive_search = subparsers.add_parser('drive-search', help='Search Google Drive')
     parser_drive_search.add_argument('--query', help='Drive query (e.g. "name contains \'resume\'")')
     parser_drive_search.add_argument('--max', type=int, default=10, help='Max results')
     parser_drive_search.add_argument('--cite', action='store_true', help='Generate WWOS-style citation')
+    parser_drive_search.set_defaults(handler=lambda a: drive_search(a.query, a.max, a.format, a.cite))
 
     parser_drive_get = subparsers.add_parser('drive-get', help='Get file metadata')
     parser_drive_get.add_argument('id', help='File ID')
     parser_drive_get.add_argument('--cite', action='store_true', help='Generate WWOS-style citation')
+    parser_drive_get.set_defaults(handler=lambda a: drive_get_file_metadata(a.id, a.format, a.cite))
 
     parser_drive_update = subparsers.add_parser('drive-update', help='Update file metadata in Drive')
     parser_drive_update.add_argument('id', help='File ID')
     parser_drive_update.add_argument('--name', help='New filename')
     parser_drive_update.add_argument('--desc', help='New description')
     parser_drive_update.add_argument('--parent', help='New parent folder ID to move file to')
+    parser_drive_update.set_defaults(handler=lambda a: drive_update_file(a.id, a.name, a.desc, a.parent, a.format))
 
     parser_drive_delete = subparsers.add_parser('drive-delete', help='Delete a file from Drive')
     parser_drive_delete.add_argument('id', help='File ID')
+    parser_drive_delete.set_defaults(handler=lambda a: drive_delete_file(a.id, a.format))
 
     parser_drive_download = subparsers.add_parser('drive-download', help='Download a file from Drive')
     parser_drive_download.add_argument('id', help='File ID')
     parser_drive_download.add_argument('out', help='Output file path')
+    parser_drive_download.set_defaults(handler=lambda a: drive_download_file(a.id, a.out, a.format))
 
     parser_drive_upload = subparsers.add_parser('drive-upload', help='Upload a file to Drive')
     parser_drive_upload.add_argument('file_path', help='Path to local file')
     parser_drive_upload.add_argument('--mime', help='MIME type')
     parser_drive_upload.add_argument('--target-mime', help='Target MIME type (e.g., application/vnd.google-apps.document for Docs)')
     parser_drive_upload.add_argument('--parent', help='Parent folder ID')
+    parser_drive_upload.set_defaults(handler=lambda a: drive_upload_file(a.file_path, a.mime, a.parent, a.target_mime, a.format))
 
     parser_drive_export = subparsers.add_parser('drive-export', help='Export a Google Doc')
     parser_drive_export.add_argument('id', help='File ID')
     parser_drive_export.add_argument('--mime', default='text/plain', help='MIME type to export to (default: text/plain)')
     parser_drive_export.add_argument('--out', help='Output file path')
+    parser_drive_export.set_defaults(handler=lambda a: drive_export_file(a.id, a.mime, a.out))
 
     parser_cal_list = subparsers.add_parser('cal-list', help='List calendar events')
     parser_cal_list.add_argument('--max', type=int, default=10, help='Max results')
     parser_cal_list.add_argument('--calendar', default='primary', help='Calendar ID (default: primary)')
+    parser_cal_list.set_defaults(handler=lambda a: calendar_list_events(a.max, a.format, a.calendar))
 
     parser_cal_create = subparsers.add_parser('cal-create', help='Create calendar event')
     parser_cal_create.add_argument('summary', help='Event summary')
@@ -1052,6 +1460,12 @@ if __name__ == '__main__':
     parser_cal_create.add_argument('--attendees', help='Comma-separated attendee emails')
     parser_cal_create.add_argument('--all-day', action='store_true', help='Create an all-day event')
     parser_cal_create.add_argument('--calendar', default='primary', help='Calendar ID (default: primary)')
+    parser_cal_create.set_defaults(handler=lambda a: calendar_create_event(a.summary, a.start, a.duration, a.desc, a.location, a.attendees, a.all_day, a.format, a.calendar))
+
+    parser_cal_bulk = subparsers.add_parser('cal-create-bulk', help='Create many events from a JSON list in batch requests')
+    parser_cal_bulk.add_argument('events_file', help="JSON file with a list of Calendar event resources ('-' for stdin)")
+    parser_cal_bulk.add_argument('--calendar', default='primary', help='Calendar ID (default: primary)')
+    parser_cal_bulk.set_defaults(handler=lambda a: calendar_create_events_bulk(a.events_file, a.format, a.calendar))
 
     parser_cal_update = subparsers.add_parser('cal-update', help='Update calendar event')
     parser_cal_update.add_argument('id', help='Event ID')
@@ -1063,83 +1477,44 @@ if __name__ == '__main__':
     parser_cal_update.add_argument('--attendees', help='Comma-separated attendee emails')
     parser_cal_update.add_argument('--all-day', type=str, choices=['true', 'false'], help='Convert to all-day (true) or timed (false)')
     parser_cal_update.add_argument('--calendar', default='primary', help='Calendar ID (default: primary)')
+    parser_cal_update.set_defaults(handler=_cmd_cal_update)
 
     parser_cal_delete = subparsers.add_parser('cal-delete', help='Delete calendar event')
     parser_cal_delete.add_argument('id', help='Event ID')
     parser_cal_delete.add_argument('--calendar', default='primary', help='Calendar ID (default: primary)')
+    parser_cal_delete.set_defaults(handler=lambda a: calendar_delete_event(a.id, a.format, a.calendar))
 
     parser_cal_get = subparsers.add_parser('cal-get', help='Get calendar event details')
     parser_cal_get.add_argument('id', help='Event ID')
     parser_cal_get.add_argument('--calendar', default='primary', help='Calendar ID (default: primary)')
+    parser_cal_get.set_defaults(handler=lambda a: calendar_get_event(a.id, a.format, a.calendar))
 
     parser_tasks_list = subparsers.add_parser('tasks-list', help='List tasks')
     parser_tasks_list.add_argument('--max', type=int, default=10, help='Max results')
+    parser_tasks_list.set_defaults(handler=lambda a: tasks_list_tasks(a.max, a.format))
 
     parser_tasks_create = subparsers.add_parser('tasks-create', help='Create task')
     parser_tasks_create.add_argument('title', help='Task title')
     parser_tasks_create.add_argument('--notes', help='Notes')
     parser_tasks_create.add_argument('--due', help='Due date (ISO format)')
+    parser_tasks_create.set_defaults(handler=lambda a: tasks_create_task(a.title, a.notes, a.due, a.format))
 
     parser_tasks_update = subparsers.add_parser('tasks-update', help='Update task')
     parser_tasks_update.add_argument('id', help='Task ID')
     parser_tasks_update.add_argument('--title', help='New title')
     parser_tasks_update.add_argument('--notes', help='New notes')
     parser_tasks_update.add_argument('--due', help='New due date (ISO format)')
+    parser_tasks_update.set_defaults(handler=lambda a: tasks_update_task(a.id, a.title, a.notes, a.due, a.format))
+
+    parser_daemon = subparsers.add_parser('daemon', help='Serve commands over a Unix socket, keeping API clients warm')
+    parser_daemon.add_argument('--socket', default=DAEMON_SOCKET, help=f'Socket path (default: {DAEMON_SOCKET})')
+    parser_daemon.set_defaults(handler=lambda a: serve_daemon(a.socket))
 
-    args = parser.parse_args()
-
-    if args.command == 'auth':
-        get_creds(port=args.port, use_console=args.console)
-        print("Authentication verified.")
-    elif args.command == 'people-create':
-        contacts_create_contact(args.given_name, args.family_name, args.job, args.company, args.phone, args.email, args.notes, args.format)
-    elif args.command == 'gmail-list':
-        gmail_list_messages(args.query, args.max, args.format, args.cite)
-    elif args.command == 'gmail-send':
-        gmail_send_message(args.to, args.subject, args.body, args.attachment, args.format)
-    elif args.command == 'gmail-create-draft':
-        gmail_create_draft(args.to, args.subject, args.body, cc=args.cc, attachment_path=args.attachment, output_format=args.format)
-    elif args.command == 'gmail-get':
-        gmail_get_message(args.id, args.format, args.cite)
-    elif args.command == 'gmail-download':
-        path = gmail_download_attachment(args.msg_id, args.att_id, args.filename, args.out)
-        if path:
-            print(f"Attachment saved to {path}")
-    elif args.command == 'gmail-get-by-header':
-        gmail_get_by_header(args.header, args.format)
-    elif args.command == 'gmail-modify-labels':
-        gmail_modify_labels(args.id, args.add, args.remove, args.format)
-
-    elif args.command == 'drive-search':
-        drive_search(args.query, args.max, args.format, args.cite)
-    elif args.command == 'drive-get':
-        drive_get_file_metadata(args.id, args.format, args.cite)
-    elif args.command == 'drive-update':
-        drive_update_file(args.id, args.name, args.desc, args.parent, args.format)
-    elif args.command == 'drive-delete':
-        drive_delete_file(args.id, args.format)
-    elif args.command == 'drive-download':
-        drive_download_file(args.id, args.out, args.format)
-    elif args.command == 'drive-export':
-        drive_export_file(args.id, args.mime, args.out)
-    elif args.command == 'drive-upload':
-        drive_upload_file(args.file_path, args.mime, args.parent, args.target_mime, args.format)
-    elif args.command == 'cal-list':
-        calendar_list_events(args.max, args.format, args.calendar)
-    elif args.command == 'cal-create':
-        calendar_create_event(args.summary, args.start, args.duration, args.desc, args.location, args.attendees, args.all_day, args.format, args.calendar)
-    elif args.command == 'cal-update':
-        all_day_bool = None
-        if args.all_day == 'true': all_day_bool = True
-        elif args.all_day == 'false': all_day_bool = False
-        calendar_update_event(args.id, args.summary, args.start, args.duration, args.desc, args.location, args.attendees, all_day_bool, args.format, args.calendar)
-    elif args.command == 'cal-get':
-        calendar_get_event(args.id, args.format, args.calendar)
-    elif args.command == 'cal-delete':
-        calendar_delete_event(args.id, args.format, args.calendar)
-    elif args.command == 'tasks-list':
-        tasks_list_tasks(args.max, args.format)
-    elif args.command == 'tasks-create':
-        tasks_create_task(args.title, args.notes, args.due, args.format)
-    elif args.command == 'tasks-update':
-        tasks_update_task(args.id, args.title, args.notes, args.due, args.format)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+#!/bin/bash
+
+# Google Workspace Manager Client
+# File: gwm_client.sh
+#
+# Sends one google_workspace_manager.py command to a running daemon
+# (started with: python3 google_workspace_manager.py daemon) and prints
+# its output. Arguments are the same as for google_workspace_manager.py.
+#
+# Usage: ./gwm_client.sh [--format json] gmail-list --max 5
+#        GWM_SOCKET=/path/to/gwm.sock ./gwm_client.sh tasks-list
+
+SOCK="${GWM_SOCKET:-${XDG_RUNTIME_DIR:-/tmp}/gwm.$(id -u).sock}"
+
+if [ ! -S "$SOCK" ]; then
+    echo "Error: daemon socket $SOCK not found. Start it with: python3 google_workspace_manager.py daemon" >&2
+    exit 1
+fi
+# The /tmp fallback is shared: never send commands to another user's socket
+if [ ! -O "$SOCK" ]; then
+    echo "Error: daemon socket $SOCK is not owned by $(id -un); refusing to use it." >&2
+    exit 1
+fi
+
+exec python3 - "$SOCK" "$@" <<'PY'
+import json, socket, sys
+conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+conn.connect(sys.argv[1])
+conn.sendall((json.dumps(sys.argv[2:]) + "\n").encode("utf-8"))
+conn.shutdown(socket.SHUT_WR)
+while True:
+    chunk = conn.recv(65536)
+    if not chunk:
+        break
+    sys.stdout.buffer.write(chunk)
+PY
@@ -2,9 +2,9 @@
 """
 ================================================================================
 Filename:       hass_api_manager.py
-Version:        1.1
+Version:        1.10
 Author:         Gemini CLI
-Last Modified:  2026-02-14
+Last Modified:  2026-10-16
 Context:        http://trac.home.arpa/ticket/2965
 
 Purpose:
@@ -16,12 +16,61 @@ Usage:
     ./hass_api_manager.py status
     ./hass_api_manager.py state <entity_id>
     ./hass_api_manager.py call <domain> <service> <json_data>
+
+Update 1.10:
+    - The token cache directory and file must be owned by the current user
+      (and not be symlinks) before they are read or written; the token is
+      written to an O_EXCL temp file and renamed into place, so a directory
+      or file planted in a shared temp dir can't capture it.
+Update 1.9:
+    - Script, vault and token-cache paths are computed once at import
+      (SCRIPT_DIR, VAULT_FILE, TMP_TOKEN_FILE).
+Update 1.8:
+    - call_service echoes the response body as-is instead of decoding and
+      re-encoding it; on/off/call accept --quiet to skip the output.
+Update 1.7:
+    - The CLI uses argparse subcommands. The token is resolved once in main()
+      before dispatch and get_headers() no longer mutates HASS_TOKEN.
+Update 1.6:
+    - Uses orjson (when installed) to decode the states list and to
+      pretty-print JSON output; stdlib json otherwise.
+Update 1.5:
+    - The cached token moved from ../tmp/hass_token.txt to a per-user 0700
+      directory under $XDG_RUNTIME_DIR (tmpfs; falls back to the system temp
+      dir) and is created with mode 0600 instead of chmod-after-write.
+Update 1.4:
+    - The decrypted vault is parsed with yaml.safe_load (once per process)
+      instead of grepping for the key line.
+Update 1.3:
+    - vault.yml is decrypted in-process with ansible's VaultLib when ansible
+      is importable and the vault password file is a plain file; otherwise
+      falls back to running `ansible-vault view`.
+Update 1.2:
+    - All REST calls go through a shared requests.Session (pooled keep-alive
+      connections, retries on 502/503/504) with the auth headers set once.
 """
 import os
+import argparse
 import requests
 import json
 import sys
 import subprocess
+import functools
+import stat
+import tempfile
+import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from ansible.parsing.vault import VaultLib, VaultSecret
+except ImportError:
+    VaultLib = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configuration
 # Default to http://hass.home.arpa if not set.
@@ -32,43 +81,92 @@ HASS_URL = os.getenv("HASS_URL", "http://hass.home.arpa")
 # FUTURE: Remember to make a temporary copy of the api key so you don't have to keep asking me for the vault password in a session.
 HASS_TOKEN = os.getenv("HASS_TOKEN")
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Assume vault.yml is in the parent directory of the script
+VAULT_FILE = os.path.join(SCRIPT_DIR, "..", "vault.yml")
+# $XDG_RUNTIME_DIR is tmpfs on Linux, so the cached token never hits disk and
+# is gone after a reboot
+TMP_TOKEN_FILE = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+                              f"hass_api_manager.{os.getuid()}", "hass_token.txt")
+
+# Shared session so consecutive calls reuse one keep-alive connection.
+# The auth headers are added on first use (see get_session) so that importing
+# this module never triggers a vault prompt.
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=10,
+                       max_retries=Retry(total=3, backoff_factor=0.2,
+                                         status_forcelist=[502, 503, 504]))
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+
 def get_token_from_tmp():
     """Attempts to retrieve the hass_token from a temporary file."""
     # Check for a temp token file to avoid repeated vault prompts
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    tmp_token_file = os.path.join(script_dir, "..", "tmp", "hass_token.txt")
-    
-    if os.path.exists(tmp_token_file):
-        try:
-            with open(tmp_token_file, 'r') as f:
-                return f.read().strip()
-        except Exception:
-            pass
-    return None
+    if not _token_dir_is_ours():
+        return None
+    try:
+        fd = os.open(TMP_TOKEN_FILE, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid():
+            return None
+        with os.fdopen(fd, 'r') as f:
+            fd = None
+            return f.read().strip() or None
+    except Exception:
+        return None
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+def _token_dir_is_ours():
+    """True if the token cache dir is a real, owner-only directory of ours."""
+    try:
+        st = os.lstat(os.path.dirname(TMP_TOKEN_FILE))
+    except OSError:
+        return False
+    return (stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid()
+            and not st.st_mode & 0o077)
+
+def _vault_password_file():
+    # Same default as vault_password_file in ansible.cfg
+    return os.path.expanduser(os.getenv("ANSIBLE_VAULT_PASSWORD_FILE", "~/.vault_pass"))
+
+def _decrypt_vault(vault_file):
+    """Returns the decrypted text of vault_file."""
+    password_file = _vault_password_file()
+    # Executable password files are scripts; leave those to ansible-vault
+    if VaultLib and os.path.isfile(password_file) and not os.access(password_file, os.X_OK):
+        with open(password_file, 'rb') as f:
+            secret = VaultSecret(f.read().strip())
+        with open(vault_file, 'rb') as f:
+            return VaultLib([("default", secret)]).decrypt(f.read()).decode("utf-8")
+
+    # This requires ansible-vault to be able to decrypt the file
+    # (e.g., via ANSIBLE_VAULT_PASSWORD_FILE or if the password is not required/cached)
+    result = subprocess.run(
+        ["ansible-vault", "view", vault_file],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout
+
+@functools.lru_cache(maxsize=None)
+def load_vault(vault_file):
+    """Returns vault_file as a dict; decrypted and parsed once per process."""
+    return yaml.safe_load(_decrypt_vault(vault_file)) or {}
 
 def get_token_from_vault():
-    """Attempts to retrieve the hass_token from vault.yml using ansible-vault."""
-    # Assume vault.yml is in the parent directory of the script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    vault_file = os.path.join(script_dir, "..", "vault.yml")
-    
-    if not os.path.exists(vault_file):
+    """Attempts to retrieve the hass_token from vault.yml."""
+    if not os.path.exists(VAULT_FILE):
         return None
-    
+
     try:
-        # This requires ansible-vault to be able to decrypt the file 
-        # (e.g., via ANSIBLE_VAULT_PASSWORD_FILE or if the password is not required/cached)
-        result = subprocess.run(
-            ["ansible-vault", "view", vault_file],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        for line in result.stdout.splitlines():
-            if "hass_gemini_api_key:" in line:
-                # Extract value after the colon and strip quotes
-                token = line.split(":", 1)[1].strip().strip("'").strip('"')
-                return token
+        token = load_vault(VAULT_FILE).get("hass_gemini_api_key")
+        return str(token) if token else None
     except (subprocess.CalledProcessError, FileNotFoundError):
         # Fail silently if vault cannot be read
         pass
@@ -77,29 +175,37 @@ def get_token_from_vault():
         
     return None
 
+def save_token_to_tmp(token):
+    """Caches the token so later runs skip the vault."""
+    tmp_path = f"{TMP_TOKEN_FILE}.{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(TMP_TOKEN_FILE), mode=0o700, exist_ok=True)
+        # An existing dir (e.g. pre-created in a shared /tmp) must be ours
+        if not _token_dir_is_ours():
+            print(f"DEBUG: Not caching token: {os.path.dirname(TMP_TOKEN_FILE)} is not a private directory",
+                  file=sys.stderr)
+            return
+        # Owner-only, and O_EXCL never follows or reuses an existing file
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(token)
+        os.replace(tmp_path, TMP_TOKEN_FILE)
+    except Exception as e:
+        print(f"DEBUG: Could not save temp token: {e}", file=sys.stderr)
+        if os.path.lexists(tmp_path) and os.lstat(tmp_path).st_uid == os.getuid():
+            os.unlink(tmp_path)
+
 def get_headers():
-    global HASS_TOKEN
-    
-    # Try to get from vault if not already set
-    if not HASS_TOKEN:
-        HASS_TOKEN = get_token_from_tmp()
+    # Environment first, then the temp cache, then the vault
+    token = HASS_TOKEN or get_token_from_tmp()
 
-    if not HASS_TOKEN:
-        HASS_TOKEN = get_token_from_vault()
+    if not token:
+        token = get_token_from_vault()
         # Save the token to the temp file if it was retrieved from the vault
-        if HASS_TOKEN:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            tmp_token_file = os.path.join(script_dir, "..", "tmp", "hass_token.txt")
-            try:
-                os.makedirs(os.path.dirname(tmp_token_file), exist_ok=True)
-                with open(tmp_token_file, 'w') as f:
-                    f.write(HASS_TOKEN)
-                # Set permissions to read/write for owner only
-                os.chmod(tmp_token_file, 0o600)
-            except Exception as e:
-                print(f"DEBUG: Could not save temp token: {e}", file=sys.stderr)
-        
-    if not HASS_TOKEN:
+        if token:
+            save_token_to_tmp(token)
+
+    if not token:
         print("Error: HASS_TOKEN environment variable is not set and could not be retrieved from vault.yml.")
         print("\nTo resolve this, you can:")
         print("1. Set the environment variable directly:")
@@ -111,16 +217,34 @@ def get_headers():
         sys.exit(1)
     
     return {
-        "Authorization": f"Bearer {HASS_TOKEN}",
+        "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
 
+def _loads(response):
+    """Decodes a JSON response body, using orjson when it is installed."""
+    if orjson:
+        return orjson.loads(response.content)
+    return response.json()
+
+def _dumps(data):
+    """Pretty-prints data as JSON, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+def get_session():
+    """Returns the shared session, resolving the auth headers on first use."""
+    if "Authorization" not in SESSION.headers:
+        SESSION.headers.update(get_headers())
+    return SESSION
+
 def check_api_status():
     """Checks if the API is running."""
     url = f"{HASS_URL}/api/"
     try:
         print(f"Checking API status at {url}...")
-        response = requests.get(url, headers=get_headers(), timeout=5)
+        response = get_session().get(url, timeout=5)
         response.raise_for_status()
         print(f"API Status: {response.json().get('message', 'OK')}")
         return True
@@ -132,10 +256,10 @@ def get_state(entity_id):
     """Retrieves state for a specific entity."""
     url = f"{HASS_URL}/api/states/{entity_id}"
     try:
-        response = requests.get(url, headers=get_headers(), timeout=5)
+        response = get_session().get(url, timeout=5)
         response.raise_for_status()
         state = response.json()
-        print(json.dumps(state, indent=2))
+        print(_dumps(state))
         return state
     except requests.exceptions.RequestException as e:
         print(f"Error getting state for {entity_id}: {e}")
@@ -145,24 +269,27 @@ def get_all_states():
     """Retrieves all states."""
     url = f"{HASS_URL}/api/states"
     try:
-        response = requests.get(url, headers=get_headers(), timeout=5)
+        response = get_session().get(url, timeout=5)
         response.raise_for_status()
-        states = response.json()
+        states = _loads(response)
         print(f"Retrieved {len(states)} states.")
         return states
     except requests.exceptions.RequestException as e:
         print(f"Error getting states: {e}")
         return []
 
-def call_service(domain, service, service_data):
-    """Calls a service."""
+def call_service(domain, service, service_data, verbose=True):
+    """Calls a service. With verbose=False only errors are printed."""
     url = f"{HASS_URL}/api/services/{domain}/{service}"
     try:
-        print(f"Calling service {domain}.{service} with data: {service_data}")
-        response = requests.post(url, headers=get_headers(), json=service_data, timeout=5)
+        if verbose:
+            print(f"Calling service {domain}.{service} with data: {service_data}")
+        response = get_session().post(url, json=service_data, timeout=5)
         response.raise_for_status()
-        print("Service call successful.")
-        print(json.dumps(response.json(), indent=2))
+        if verbose:
+            print("Service call successful.")
+            # The body is already JSON; echo it rather than parse and re-dump it
+            sys.stdout.write(response.text + "\n")
     except requests.exceptions.RequestException as e:
         print(f"Error calling service: {e}")
 
@@ -172,7 +299,7 @@ def get_device_registry():
     # We use a long-lived access token to authenticate a WebSocket connection.
     import websocket # requires 'pip install websocket-client'
     
-    token = get_headers()["Authorization"].split(" ")[1]
+    token = get_session().headers["Authorization"].split(" ")[1]
     ws_url = f"{HASS_URL.replace('http', 'ws')}/api/websocket"
     
     try:
@@ -203,59 +330,64 @@ def get_device_registry():
         print(f"Error connecting to WebSocket: {e}")
         return []
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: ./hass_api_manager.py <command> [args]")
-        print("Commands:")
-        print("  status              - Check API status")
-        print("  states              - List all states (summary)")
-        print("  state <entity_id>   - Get full state of an entity")
-        print("  on <entity_id>      - Turn on a light/switch")
-        print("  off <entity_id>     - Turn off a light/switch")
-        print("  call <domain> <service> <json_data> - Generic service call")
-        print("  list_devices        - List all devices from registry (JSON)")
-        sys.exit(1)
+# --- CLI ---
+
+def _json_arg(value):
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        raise argparse.ArgumentTypeError("Invalid JSON data")
 
-    command = sys.argv[1]
-
-    if command == "status":
-        check_api_status()
-    elif command == "states":
-        states = get_all_states()
-        for s in states:
-            print(f"{s['entity_id']}: {s['state']}")
-    elif command == "state":
-        if len(sys.argv) < 3:
-            print("Usage: ./hass_api_manager.py state <entity_id>")
-            sys.exit(1)
-        get_state(sys.argv[2])
-    elif command == "on":
-        if len(sys.argv) < 3:
-            print("Usage: ./hass_api_manager.py on <entity_id>")
-            sys.exit(1)
-        call_service("homeassistant", "turn_on", {"entity_id": sys.argv[2]})
-    elif command == "off":
-        if len(sys.argv) < 3:
-            print("Usage: ./hass_api_manager.py off <entity_id>")
-            sys.exit(1)
-        call_service("homeassistant", "turn_off", {"entity_id": sys.argv[2]})
-    elif command == "call":
-        if len(sys.argv) < 5:
-            print("Usage: ./hass_api_manager.py call <domain> <service> <json_data>")
-            sys.exit(1)
-        domain = sys.argv[2]
-        service = sys.argv[3]
-        try:
-            data = json.loads(sys.argv[4])
-        except json.JSONDecodeError:
-            print("Error: Invalid JSON data")
-            sys.exit(1)
-        call_service(domain, service, data)
-    elif command == "dump":
-        states = get_all_states()
-        print(json.dumps(states, indent=2))
-    elif command == "list_devices":
-        devices = get_device_registry()
-        print(json.dumps(devices, indent=2))
-    else:
-        print(f"Unknown command: {command}")
+def _cmd_states(args):
+    states = get_all_states()
+    sys.stdout.writelines(f"{s['entity_id']}: {s['state']}\n" for s in states)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Interact with the Home Assistant API.")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="<command>")
+
+    # Shared by the service-call subcommands
+    quiet_parent = argparse.ArgumentParser(add_help=False)
+    quiet_parent.add_argument("-q", "--quiet", action="store_true",
+                              help="Only print errors")
+
+    subparsers.add_parser("status", help="Check API status").set_defaults(
+        handler=lambda a: check_api_status())
+    subparsers.add_parser("states", help="List all states (summary)").set_defaults(
+        handler=_cmd_states)
+
+    parser_state = subparsers.add_parser("state", help="Get full state of an entity")
+    parser_state.add_argument("entity_id")
+    parser_state.set_defaults(handler=lambda a: get_state(a.entity_id))
+
+    parser_on = subparsers.add_parser("on", help="Turn on a light/switch", parents=[quiet_parent])
+    parser_on.add_argument("entity_id")
+    parser_on.set_defaults(handler=lambda a: call_service(
+        "homeassistant", "turn_on", {"entity_id": a.entity_id}, verbose=not a.quiet))
+
+    parser_off = subparsers.add_parser("off", help="Turn off a light/switch", parents=[quiet_parent])
+    parser_off.add_argument("entity_id")
+    parser_off.set_defaults(handler=lambda a: call_service(
+        "homeassistant", "turn_off", {"entity_id": a.entity_id}, verbose=not a.quiet))
+
+    parser_call = subparsers.add_parser("call", help="Generic service call", parents=[quiet_parent])
+    parser_call.add_argument("domain")
+    parser_call.add_argument("service")
+    parser_call.add_argument("json_data", type=_json_arg)
+    parser_call.set_defaults(handler=lambda a: call_service(
+        a.domain, a.service, a.json_data, verbose=not a.quiet))
+
+    subparsers.add_parser("dump", help="Dump all states (JSON)").set_defaults(
+        handler=lambda a: print(_dumps(get_all_states())))
+    subparsers.add_parser("list_devices", help="List all devices from registry (JSON)").set_defaults(
+        handler=lambda a: print(_dumps(get_device_registry())))
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Resolve the token once, before dispatch; every call below reuses it
+    SESSION.headers.update(get_headers())
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
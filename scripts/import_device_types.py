@@ -8,11 +8,27 @@ import sys
 import yaml
 import requests
 import glob
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InsecureRequestWarning
+
+# libyaml-backed loader when PyYAML was built with it; pure Python otherwise
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # Configuration
 NETBOX_URL = "http://netbox1.home.arpa"
 NETBOX_TOKEN = os.environ.get("NETBOX_TOKEN")
 DEVICE_TYPES_DIR = "device-types"
+# Files are imported concurrently; the work is network-bound
+MAX_WORKERS = 8
+# Page size when prefetching the existing catalog
+PAGE_LIMIT = 1000
 
 if not NETBOX_TOKEN:
     try:
@@ -28,15 +44,48 @@ if not NETBOX_TOKEN:
     print("Error: NETBOX_TOKEN not set.", file=sys.stderr)
     sys.exit(1)
 
-HEADERS = {
+# One pooled session for every NetBox call so all device-type files share
+# the same keep-alive connections instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.headers.update({
     "Authorization": f"Token {NETBOX_TOKEN}",
     "Content-Type": "application/json",
     "Accept": "application/json",
-}
+})
+SESSION.verify = False
+SESSION.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+urllib3.disable_warnings(InsecureRequestWarning)
+
+# Each file's output is printed as one block so parallel imports don't interleave
+PRINT_LOCK = threading.Lock()
+# Serializes lookup-or-create per manufacturer so two files from the same
+# vendor don't both POST it
+_MFR_LOCKS = defaultdict(threading.Lock)
+# Same per key for device type slugs, so duplicate slugs in one run are
+# created once and the other files see them as existing
+_SLUG_LOCKS = defaultdict(threading.Lock)
+_LOCKS_GUARD = threading.Lock()
+# Manufacturer name -> ID, so each vendor is looked up at most once per run
+_MFR_IDS = {}
+
+def fetch_all(endpoint):
+    """Returns every object from a NetBox list endpoint, following pagination."""
+    url = f"{NETBOX_URL}/api/dcim/{endpoint}/"
+    params = {"limit": PAGE_LIMIT, "brief": 1}
+    results = []
+    while url:
+        resp = SESSION.get(url, params=params)
+        resp.raise_for_status()
+        page = resp.json()
+        results.extend(page['results'])
+        # 'next' already carries the query string
+        url, params = page.get('next'), None
+    return results
 
 def get_manufacturer_id(name):
     url = f"{NETBOX_URL}/api/dcim/manufacturers/?name={name}"
-    resp = requests.get(url, headers=HEADERS, verify=False)
+    resp = SESSION.get(url)
     if resp.ok and resp.json()['count'] > 0:
         return resp.json()['results'][0]['id']
     return None
@@ -44,82 +93,154 @@ def get_manufacturer_id(name):
 def create_manufacturer(name):
     url = f"{NETBOX_URL}/api/dcim/manufacturers/"
     data = {"name": name, "slug": name.lower().replace(" ", "-")}
-    resp = requests.post(url, headers=HEADERS, json=data, verify=False)
+    resp = SESSION.post(url, json=data)
     if resp.ok:
         return resp.json()['id']
     return None
 
-def import_device_type(filepath):
-    with open(filepath, 'r') as f:
-        dt_data = yaml.safe_load(f)
+def _key_lock(locks, key):
+    """Returns the lock for key from a defaultdict of locks."""
+    with _LOCKS_GUARD:
+        return locks[key]
+
+def ensure_manufacturer(name, log):
+    """Returns the manufacturer ID (cached per run), creating it if needed."""
+    with _key_lock(_MFR_LOCKS, name):
+        mfr_id = _MFR_IDS.get(name)
+        if mfr_id:
+            return mfr_id
+        mfr_id = get_manufacturer_id(name)
+        if not mfr_id:
+            log.append(f"  Creating manufacturer: {name}")
+            mfr_id = create_manufacturer(name)
+        if mfr_id:
+            _MFR_IDS[name] = mfr_id
+        return mfr_id
+
+def create_templates(endpoint, label, payloads, log):
+    """
+    Creates component templates with a single bulk POST. If NetBox rejects the
+    batch (one bad item fails the whole list), retries item by item so the
+    valid ones still get created.
+    """
+    if not payloads:
+        return
+    url = f"{NETBOX_URL}/api/dcim/{endpoint}/"
+    resp = SESSION.post(url, json=payloads)
+    if resp.status_code == 201:
+        for item in payloads:
+            log.append(f"    Added {label}: {item['name']}")
+        return
+
+    for item in payloads:
+        resp = SESSION.post(url, json=item)
+        if resp.status_code == 201:
+            log.append(f"    Added {label}: {item['name']}")
+        else:
+            log.append(f"    Failed to add {label} {item['name']}: {resp.text}")
+
+REQUIRED_FIELDS = ('manufacturer', 'model', 'slug')
+# Component list key in the YAML -> fields every entry must have
+REQUIRED_COMPONENT_FIELDS = {
+    'power-ports': ('name',),
+    'interfaces': ('name',),
+}
+
+def load_device_type(filepath):
+    # Binary mode lets the loader detect the encoding itself
+    with open(filepath, 'rb') as f:
+        return yaml.load(f, Loader=SafeLoader)
 
+def validate_device_type(dt_data):
+    """Returns a list of problems with a parsed device type (empty if valid)."""
+    if not isinstance(dt_data, dict):
+        return ["not a YAML mapping"]
+    errors = [f"missing '{field}'" for field in REQUIRED_FIELDS if not dt_data.get(field)]
+    for key, fields in REQUIRED_COMPONENT_FIELDS.items():
+        components = dt_data.get(key) or []
+        if not isinstance(components, list):
+            errors.append(f"'{key}' must be a list")
+            continue
+        for i, component in enumerate(components):
+            if not isinstance(component, dict):
+                errors.append(f"{key}[{i}] must be a mapping")
+                continue
+            errors.extend(f"{key}[{i}] missing '{field}'" for field in fields if not component.get(field))
+    return errors
+
+def import_device_type(dt_data, existing_slugs):
+    log = []
+    try:
+        _import_device_type(dt_data, existing_slugs, log)
+    finally:
+        if log:
+            with PRINT_LOCK:
+                print("\n".join(log), flush=True)
+
+def _import_device_type(dt_data, existing_slugs, log):
     model = dt_data.get('model')
     slug = dt_data.get('slug')
     manufacturer_name = dt_data.get('manufacturer')
 
-    print(f"Processing {manufacturer_name} {model}...")
+    log.append(f"Processing {manufacturer_name} {model}...")
 
-    # 1. Handle Manufacturer
-    mfr_id = get_manufacturer_id(manufacturer_name)
-    if not mfr_id:
-        print(f"  Creating manufacturer: {manufacturer_name}")
-        mfr_id = create_manufacturer(manufacturer_name)
+    # Held until the slug is created (or has failed), so a second file with
+    # the same slug waits and then finds it in existing_slugs
+    with _key_lock(_SLUG_LOCKS, slug):
+        # 1. Check if Device Type exists (against the catalog prefetched in main)
+        if slug in existing_slugs:
+            log.append(f"  Device type {model} already exists. Skipping.")
+            return
+
+        # 2. Handle Manufacturer
+        mfr_id = ensure_manufacturer(manufacturer_name, log)
         if not mfr_id:
-            print(f"  Failed to create manufacturer {manufacturer_name}")
+            log.append(f"  Failed to create manufacturer {manufacturer_name}")
             return
 
-    # 2. Check if Device Type exists
-    url = f"{NETBOX_URL}/api/dcim/device-types/?slug={slug}"
-    resp = requests.get(url, headers=HEADERS, verify=False)
-    if resp.ok and resp.json()['count'] > 0:
-        print(f"  Device type {model} already exists. Skipping.")
-        return
-    
-    # 3. Create Device Type
-    payload = {
-        "manufacturer": mfr_id,
-        "model": model,
-        "slug": slug,
-        "part_number": dt_data.get('part_number', ''),
-        "u_height": dt_data.get('u_height', 1),
-        "is_full_depth": dt_data.get('is_full_depth', True),
-        "comments": dt_data.get('comments', '')
-    }
-    
-    create_url = f"{NETBOX_URL}/api/dcim/device-types/"
-    resp = requests.post(create_url, headers=HEADERS, json=payload, verify=False)
-    
+        # 3. Create Device Type
+        payload = {
+            "manufacturer": mfr_id,
+            "model": model,
+            "slug": slug,
+            "part_number": dt_data.get('part_number', ''),
+            "u_height": dt_data.get('u_height', 1),
+            "is_full_depth": dt_data.get('is_full_depth', True),
+            "comments": dt_data.get('comments', '')
+        }
+
+        create_url = f"{NETBOX_URL}/api/dcim/device-types/"
+        resp = SESSION.post(create_url, json=payload)
+        if resp.status_code == 201:
+            existing_slugs.add(slug)
+
     if resp.status_code == 201:
         new_dt = resp.json()
-        print(f"  Successfully created device type: {model}")
+        log.append(f"  Successfully created device type: {model}")
         dt_id = new_dt['id']
         
-        # 4. Create Components
-        # Power Ports
-        for pp in dt_data.get('power-ports', []):
-            pp_payload = {
+        # 4. Create Components (one bulk POST per template type)
+        create_templates("power-port-templates", "Power Port", [
+            {
                 "device_type": dt_id,
                 "name": pp['name'],
                 "type": pp.get('type', 'iec-60320-c14'),
                 "maximum_draw": pp.get('maximum_draw'),
                 "allocated_draw": pp.get('allocated_draw')
             }
-            requests.post(f"{NETBOX_URL}/api/dcim/power-port-templates/", headers=HEADERS, json=pp_payload, verify=False)
-            print(f"    Added Power Port: {pp['name']}")
-
-        # Interfaces
-        for iface in dt_data.get('interfaces', []):
-            if_payload = {
+            for pp in dt_data.get('power-ports') or []
+        ], log)
+        create_templates("interface-templates", "Interface", [
+            {
                 "device_type": dt_id,
                 "name": iface['name'],
                 "type": iface.get('type', '1000base-t'),
                 "mgmt_only": iface.get('mgmt_only', False)
             }
-            requests.post(f"{NETBOX_URL}/api/dcim/interface-templates/", headers=HEADERS, json=if_payload, verify=False)
-            print(f"    Added Interface: {iface['name']}")
-            
+            for iface in dt_data.get('interfaces') or []
+        ], log)
     else:
-        print(f"  Failed to create device type. Error: {resp.text}")
+        log.append(f"  Failed to create device type. Error: {resp.text}")
 
 def main():
     if not os.path.isdir(DEVICE_TYPES_DIR):
@@ -131,8 +252,34 @@ def main():
         print("No YAML files found in device-types/.")
         return
 
-    for f in files:
-        import_device_type(f)
+    # Parse and validate every file before touching NetBox, so one bad file
+    # doesn't leave a half-imported run behind, and all problems show at once
+    device_types = []
+    errors = []
+    for filepath in files:
+        try:
+            dt_data = load_device_type(filepath)
+        except (OSError, yaml.YAMLError) as e:
+            errors.append(f"{filepath}: {e}")
+            continue
+        errors.extend(f"{filepath}: {problem}" for problem in validate_device_type(dt_data))
+        device_types.append(dt_data)
+    if errors:
+        print("Invalid device type definitions; nothing was imported:", file=sys.stderr)
+        for error in errors:
+            print(f"  {error}", file=sys.stderr)
+        sys.exit(1)
+
+    # Fetch the existing catalog once instead of one lookup per file
+    try:
+        existing_slugs = {dt['slug'] for dt in fetch_all("device-types")}
+        _MFR_IDS.update((m['name'], m['id']) for m in fetch_all("manufacturers"))
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching existing device types from NetBox: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        list(pool.map(lambda dt: import_device_type(dt, existing_slugs), device_types))
 
 if __name__ == "__main__":
     main()
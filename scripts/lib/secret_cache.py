@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+================================================================================
+Filename:       scripts/lib/secret_cache.py
+Version:        1.2
+Author:         Gemini CLI
+Last Modified:  2026-10-16
+
+Purpose:
+    Resolves secrets such as NETBOX_TOKEN or TRAC_PASSWORD for the helper
+    scripts. Checks the environment first, then a per-user cache file, and
+    only falls back to scanning ~/.bashrc when the cache is missing or stale.
+    The value found in ~/.bashrc is written back to the cache (mode 0600).
+
+    Update 1.2:
+    - The cache file is opened with O_NOFOLLOW and checked on the open
+      descriptor (regular file, owned by us, no group/other access), so a
+      symlink planted in a shared /tmp can't be read back as the secret.
+      Writes refuse a cache directory that is a symlink or another user's.
+    Update 1.1:
+    - ~/.bashrc is searched with a compiled regex over an mmap instead of a
+      Python line loop; commented-out exports are no longer matched.
+    Update 1.0:
+    - Initial release.
+================================================================================
+"""
+import functools
+import mmap
+import os
+import re
+import stat
+import time
+
+BASHRC_PATH = os.path.expanduser("~/.bashrc")
+CACHE_MAX_AGE = 3600  # seconds
+
+
+def _cache_path(var):
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "/tmp")
+    return os.path.join(runtime_dir, f"{var}.{os.getuid()}.cache")
+
+
+def _read_cache(var):
+    """Returns the cached value if fresh and newer than ~/.bashrc, else None."""
+    path = _cache_path(var)
+    try:
+        # O_NOFOLLOW + fstat: the checks apply to the file actually read,
+        # not to whatever a symlink at path points to
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+    try:
+        st = os.fstat(fd)
+        if (not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid()
+                or st.st_mode & 0o077):
+            return None
+        if time.time() - st.st_mtime > CACHE_MAX_AGE:
+            return None
+        if os.path.exists(BASHRC_PATH) and os.path.getmtime(BASHRC_PATH) > st.st_mtime:
+            return None
+        value = os.read(fd, 4096).decode("utf-8")
+        return value or None
+    except (OSError, UnicodeDecodeError):
+        return None
+    finally:
+        os.close(fd)
+
+
+def _safe_cache_dir(path):
+    """True if path's directory is a real directory owned by us or root."""
+    try:
+        st = os.lstat(os.path.dirname(path))
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid in (os.getuid(), 0)
+
+
+def _write_cache(var, value):
+    path = _cache_path(var)
+    if not _safe_cache_dir(path):
+        return
+    tmp_path = f"{path}.{os.getpid()}"
+    try:
+        # O_EXCL never follows or reuses an existing (possibly planted) file
+        fd = os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    except OSError:
+        return
+    try:
+        try:
+            os.write(fd, value.encode("utf-8"))
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+@functools.lru_cache(maxsize=None)
+def _export_pattern(var):
+    # Matches: export VAR="value", export VAR='value' or export VAR=value
+    return re.compile(
+        rb"^[ \t]*export[ \t]+" + re.escape(var.encode()) +
+        rb"""=(?:"([^"\n]*)"|'([^'\n]*)'|(\S+))""",
+        re.M,
+    )
+
+
+def read_bashrc_export(var):
+    """Searches ~/.bashrc for 'export VAR=value' and returns the unquoted value."""
+    try:
+        with open(BASHRC_PATH, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                match = _export_pattern(var).search(mm)
+                # Copy the value out before the mapping is closed
+                value = next((g for g in match.groups() if g), b"") if match else b""
+    except (OSError, ValueError):
+        # ValueError: mmap of an empty file
+        return None
+    return value.decode("utf-8") or None
+
+
+def resolve_secret(var):
+    """Returns the value of var from the environment, cache or ~/.bashrc."""
+    value = os.getenv(var)
+    if value:
+        return value
+
+    value = _read_cache(var)
+    if value:
+        return value
+
+    value = read_bashrc_export(var)
+    if value:
+        _write_cache(var, value)
+    return value
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+================================================================================
+Filename:       scripts/lib/trac_last_id.py
+Version:        1.0
+Author:         Gemini CLI
+Last Modified:  2026-10-16
+
+Purpose:
+    Short-lived cache of the most recent Trac ticket ID, shared by
+    get_last_ticket_id.py (which reads and fills it) and the ticket creation
+    scripts (which drop it, so a lookup right after creating a ticket sees
+    the new ID). The file is per user, under $XDG_RUNTIME_DIR when set.
+
+    Update 1.0:
+    - Initial release (moved out of get_last_ticket_id.py, which used a fixed
+      /tmp/trac_last_id shared by all users).
+================================================================================
+"""
+import os
+import stat
+import tempfile
+import time
+
+CACHE_TTL = 5  # seconds
+
+
+def _cache_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"trac_last_id.{os.getuid()}")
+
+
+def read_cached_id():
+    """Returns the cached ticket ID if it is younger than CACHE_TTL, else None."""
+    try:
+        # No symlinks, and only a file of ours: the fallback dir may be shared
+        fd = os.open(_cache_path(), os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid():
+            return None
+        if time.time() - st.st_mtime >= CACHE_TTL:
+            return None
+        return int(os.read(fd, 64).decode("ascii").strip())
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+
+
+def write_cached_id(ticket_id):
+    path = _cache_path()
+    tmp_path = f"{path}.{os.getpid()}"
+    try:
+        fd = os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    except OSError:
+        return
+    try:
+        try:
+            os.write(fd, str(ticket_id).encode("ascii"))
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def invalidate():
+    """Drops the cached ID; call after creating a ticket."""
+    try:
+        os.unlink(_cache_path())
+    except OSError:
+        pass
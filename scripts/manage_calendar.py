@@ -2,9 +2,9 @@
 """
 ================================================================================
 Filename:       scripts/manage_calendar.py
-Version:        2.1
+Version:        2.2
 Author:         Gemini CLI
-Last Modified:  2026-02-20
+Last Modified:  2026-10-16
 Context:        http://trac.home.arpa/ticket/3080
 
 Purpose:
@@ -18,23 +18,26 @@ Usage:
     python3 manage_calendar.py create_task "Title" --notes "Details"
 
 Revision History:
+    v2.2 (2026-10-16): Call google_workspace_manager.main() in-process instead
+                       of spawning a second python3; its exit code now propagates.
     v2.1 (2026-02-20): Improved manager path resolution using os.path.dirname.
     v1.0: Original standalone script.
     v2.0 (2026-02-16): Refactored as a wrapper for unified manager.
 ================================================================================
 """
 import sys
-import subprocess
 import argparse
 import os
 
+# Make the manager importable regardless of the current working directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
 def run_command(cmd_args):
-    # Determine the directory where this script resides
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    manager_path = os.path.join(script_dir, "google_workspace_manager.py")
-    
-    full_cmd = ["python3", manager_path] + cmd_args
-    subprocess.run(full_cmd)
+    # Imported here so --help and argument errors don't load the manager
+    import google_workspace_manager
+    google_workspace_manager.main(cmd_args)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Manage Google Calendar and Tasks (Legacy Wrapper)')
@@ -2,9 +2,9 @@
 """
 ================================================================================
 Filename:       manage_nextcloud_contacts.py
-Version:        1.8
+Version:        1.27
 Author:         Gemini CLI
-Last Modified:  2026-04-01
+Last Modified:  2026-10-16
 Context:        Nextcloud Contact Management Interface
 
 Purpose:
@@ -15,11 +15,47 @@ Purpose:
     Version 1.6 adds password caching to avoid repeated vault prompts.
     Version 1.7 adds support for ORG and TITLE fields.
     Version 1.8 adds validation to disallow multiple or malformed email/phone entries.
+    Version 1.9 searches server-side with a CardDAV addressbook-query REPORT.
+    Version 1.10 stream-parses multistatus responses with iterparse.
+    Version 1.11 uses precomputed Clark-notation tag names when parsing XML.
+    Version 1.12 extracts all display fields from a vCard in one regex pass.
+    Version 1.13 list/search request only the displayed vCard properties
+                 (REPORT addressbook-query), skipping PHOTO and other large fields.
+    Version 1.14 mounts a pooled HTTPAdapter with retries on 502/503/504.
+    Version 1.15 adds bulk delete/update (one listing, concurrent requests):
+                 `delete` accepts several UIDs and `bulk-update` reads a JSON file.
+    Version 1.16 list_contacts is a generator parsing the streamed response;
+                 `list` prints contacts as they arrive and the count last.
+    Version 1.17 update_contact edits the fetched vCard in place: properties it
+                 doesn't touch are written back verbatim and in their original order.
+    Version 1.18 update_contact PUTs with If-Match on the fetched ETag and
+                 re-applies the edit once if the card changed in between (412).
+    Version 1.19 adds a `daemon` subcommand that keeps one authenticated session
+                 open on a Unix socket; while it runs, the CLI forwards commands to it.
+    Version 1.20 keeps a local contact cache updated with the CardDAV sync-collection
+                 REPORT; only changed cards are fetched (one addressbook-multiget).
+    Version 1.21 adds get_contacts_by_hrefs (addressbook-multiget); bulk-update
+                 fetches all target cards in that one REPORT instead of a GET each.
+    Version 1.22 builds the fixed REPORT bodies once, as bytes, at class level.
+    Version 1.23 create_contact writes the vCard straight into one io.StringIO buffer.
+    Version 1.24 sync-collection is sent with Depth: 0 (RFC 6578), and the sync-token
+                 only advances once every changed card has been fetched.
+    Version 1.25 the daemon declines commands whose server, account, SSL or cache
+                 options differ from its own (the CLI then runs them locally), and
+                 the CLI only connects to a daemon socket owned by the current user.
+    Version 1.26 bulk-update checks every entry (a "uid" plus editable fields only)
+                 before sending anything, and a contact that fails with an
+                 exception is reported as an error instead of aborting the batch.
+    Version 1.27 the daemon won't start over a live daemon's socket or a path that
+                 isn't a socket of ours, and on exit only removes the socket it bound.
 
 Usage:
-    # List all contacts
+    # List all contacts (incremental sync into ~/.cache/nextcloud-contacts/)
     ./manage_nextcloud_contacts.py list
 
+    # List straight from the server, bypassing the local cache
+    ./manage_nextcloud_contacts.py --no-cache list
+
     # Search for a contact
     ./manage_nextcloud_contacts.py search "John Doe"
 
@@ -32,8 +68,14 @@ Usage:
     # Update a contact from a VCard file
     ./manage_nextcloud_contacts.py update <UID> --vcard-file /path/to/contact.vcf
 
-    # Delete a contact
-    ./manage_nextcloud_contacts.py delete <UID>
+    # Delete one or more contacts
+    ./manage_nextcloud_contacts.py delete <UID> [<UID> ...]
+
+    # Update many contacts from a JSON list of {"uid": ..., "email": ..., ...}
+    ./manage_nextcloud_contacts.py bulk-update updates.json
+
+    # Keep a warm session for scripted loops; other invocations use it while it runs
+    ./manage_nextcloud_contacts.py daemon &
 
 Dependencies:
     python3, requests
@@ -43,17 +85,112 @@ import os
 import sys
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import uuid
+import hashlib
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+import re
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape as xml_escape
+import stat
 import subprocess
 from collections import defaultdict
 
 # Configuration Defaults
 DEFAULT_URL = "https://ynh2.van-bee.ts.net/nextcloud"
 DEFAULT_USER = "will"
+# Concurrent requests for bulk update/delete (within the adapter's pool_maxsize)
+BULK_WORKERS = 8
+# Unix socket served by the 'daemon' subcommand; the CLI forwards commands to it
+# when present (NEXTCLOUD_SOCKET overrides the path)
+DAEMON_SOCKET = os.environ.get("NEXTCLOUD_SOCKET") or (
+    os.path.join(os.environ["XDG_RUNTIME_DIR"], "nc-contacts.sock") if os.environ.get("XDG_RUNTIME_DIR")
+    else f"/tmp/nc-contacts.{os.getuid()}.sock"
+)
+# Exit status the daemon reports for a command it won't run (settings differ)
+DAEMON_DECLINED = -1
+# Contacts synced by list/UID lookups, one <user>.json per account (see sync_contacts)
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                         "nextcloud-contacts")
+# Fetch/edit/PUT cycles tried by update_contact when the card changes underneath it
+UPDATE_ATTEMPTS = 2
+# vCard properties matched (case-insensitive substring) by the search command
+SEARCH_PROPS = ("FN", "EMAIL", "TEL", "ORG", "CATEGORIES", "NOTE")
+# vCard properties shown by list/search; the server is asked for only these
+DISPLAY_PROPS = ("FN", "EMAIL", "TEL", "URL", "CATEGORIES", "NOTE", "ORG", "TITLE", "ADR", "UID")
+# <c:address-data> restricted to DISPLAY_PROPS (CardDAV partial retrieval)
+ADDRESS_DATA_DISPLAY = (
+    "<c:address-data>"
+    + "".join(f'<c:prop name="{prop}"/>' for prop in DISPLAY_PROPS)
+    + "</c:address-data>"
+)
+
+# Namespaced tag names in ElementTree's {uri}local form, so the parser
+# doesn't resolve prefixes against a namespace map for every element
+NS_DAV = "{DAV:}"
+NS_CARDDAV = "{urn:ietf:params:xml:ns:carddav}"
+NS_RESPONSE = f"{NS_DAV}response"
+NS_HREF = f"{NS_DAV}href"
+NS_PROPSTAT = f"{NS_DAV}propstat"
+NS_PROP = f"{NS_DAV}prop"
+NS_STATUS = f"{NS_DAV}status"
+NS_GETETAG = f"{NS_DAV}getetag"
+NS_SYNC_TOKEN = f"{NS_DAV}sync-token"
+NS_ADDRDATA = f"{NS_CARDDAV}address-data"
+# <d:response> -> any propstat's address-data / getetag
+ADDRDATA_PATH = f"{NS_PROPSTAT}/{NS_PROP}/{NS_ADDRDATA}"
+GETETAG_PATH = f"{NS_PROPSTAT}/{NS_PROP}/{NS_GETETAG}"
 
 class NextcloudContactManager:
-    def __init__(self, base_url, username, password, addressbook="contacts", verify=True):
+    # One line of a display field: NAME[;params]:value (params cannot contain ':')
+    _FIELD_RE = re.compile(
+        r'^(' + '|'.join(DISPLAY_PROPS) + r')(?:;[^:\r\n]*)?:([^\r\n]*)',
+        re.MULTILINE
+    )
+
+    # Keys a bulk-update entry may set besides "uid" (update_contact's edit arguments)
+    _BULK_UPDATE_FIELDS = frozenset({
+        "fn", "email", "tel", "categories", "address", "url", "note", "vcard_file", "org", "title",
+    })
+
+    # REPORT bodies, built once. The listing never changes; the search and
+    # sync bodies only need their escaped parameters filled in.
+    _LIST_BODY = (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<c:addressbook-query xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:carddav">'
+        f'<d:prop><d:getetag/>{ADDRESS_DATA_DISPLAY}</d:prop>'
+        # An empty filter matches every card and, unlike PROPFIND, lets
+        # address-data name the properties to return
+        '<c:filter/>'
+        '</c:addressbook-query>'
+    ).encode('utf-8')
+    _SEARCH_BODY_TEMPLATE = (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<c:addressbook-query xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:carddav">'
+        f'<d:prop><d:getetag/>{ADDRESS_DATA_DISPLAY}</d:prop>'
+        '<c:filter test="anyof">'
+        + "".join(
+            f'<c:prop-filter name="{prop}">'
+            '<c:text-match collation="i;unicode-casemap" match-type="contains">{query}</c:text-match>'
+            '</c:prop-filter>'
+            for prop in SEARCH_PROPS
+        )
+        + '</c:filter>'
+        '</c:addressbook-query>'
+    )
+    _SYNC_BODY_TEMPLATE = (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<d:sync-collection xmlns:d="DAV:">'
+        '<d:sync-token>{sync_token}</d:sync-token>'
+        '<d:sync-level>1</d:sync-level>'
+        '<d:prop><d:getetag/></d:prop>'
+        '</d:sync-collection>'
+    )
+
+    def __init__(self, base_url, username, password, addressbook="contacts", verify=True, cache_dir=None):
         self.base_url = base_url.rstrip('/')
         self.username = username
         self.password = password
@@ -61,39 +198,170 @@ class NextcloudContactManager:
         self.verify = verify
         # Construct the CardDAV URL
         self.dav_url = f"{self.base_url}/remote.php/dav/addressbooks/users/{self.username}/{self.addressbook}/"
+        # Without a cache dir, sync_contacts falls back to a full listing
+        self.cache_file = os.path.join(cache_dir, f"{self.username}.json") if cache_dir else None
         self.session = requests.Session()
         self.session.auth = (self.username, self.password)
         self.session.headers.update({"Content-Type": "application/xml", "User-Agent": "GeminiCLI/1.5"})
         self.session.verify = self.verify
+        # Keep-alive pool shared by every call (and by the bulk workers);
+        # PROPFIND/REPORT are read-only, so they are safe to retry too
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"PROPFIND", "REPORT"})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _report_contacts(self, body, action):
+        """Sends a REPORT (body as bytes) and yields contacts while the multistatus streams in."""
+        with self.session.request('REPORT', self.dav_url, data=body,
+                                  headers={'Depth': '1'}, stream=True) as response:
+            if response.status_code != 207:
+                print(f"Error {action}: {response.status_code} - {response.text}", file=sys.stderr)
+                return
+            # Let urllib3 undo any gzip/deflate transfer encoding for the parser
+            response.raw.decode_content = True
+            yield from self._parse_multistatus(response.raw)
 
     def list_contacts(self):
-        """Fetches all contacts from the addressbook."""
-        body = """
-        <d:propfind xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:carddav">
+        """
+        Yields every contact in the addressbook as it is parsed. Only the
+        DISPLAY_PROPS are returned in each 'vcard'; GET the href for the full card.
+        """
+        return self._report_contacts(self._LIST_BODY, "fetching contacts")
+
+    def sync_contacts(self):
+        """
+        Returns every contact (DISPLAY_PROPS only, plus 'etag') from the local
+        cache after bringing it up to date with a sync-collection REPORT: only
+        cards added or changed since the stored sync-token are downloaded, in a
+        single addressbook-multiget. Without a cache_file this is list_contacts().
+        """
+        if not self.cache_file:
+            return list(self.list_contacts())
+
+        cache = self._load_cache()
+        result = self._sync_collection(cache['sync_token'])
+        if result is None and cache['sync_token']:
+            # Token expired or rejected by the server: start over with a full sync
+            cache = {'sync_token': "", 'entries': {}}
+            result = self._sync_collection("")
+        if result is None:
+            return []
+        etags, deleted, sync_token = result
+
+        entries = cache['entries']
+        for href in deleted:
+            entries.pop(href, None)
+        changed = [href for href, etag in etags.items()
+                   if href not in entries or entries[href].get('etag') != etag]
+        if changed:
+            fetched = self.get_contacts_by_hrefs(changed, props=DISPLAY_PROPS)
+            for contact in fetched:
+                entries[contact['href']] = contact
+            if len({c['href'] for c in fetched} & set(changed)) < len(changed):
+                # The multiget failed or skipped cards; keep the old token so
+                # the next sync reports them again instead of losing them
+                print("Warning: some changed contacts could not be fetched; they will be retried.",
+                      file=sys.stderr)
+                sync_token = cache['sync_token']
+
+        self._save_cache({'sync_token': sync_token, 'entries': entries})
+        return list(entries.values())
+
+    def _sync_collection(self, sync_token):
+        """
+        Sends a sync-collection REPORT (etags only). Returns ({href: etag} of
+        added/changed cards, [deleted hrefs], new sync-token), or None on error.
+        """
+        body = self._SYNC_BODY_TEMPLATE.format(sync_token=xml_escape(sync_token)).encode('utf-8')
+        # RFC 6578 3.2: sync-collection is only defined for Depth: 0
+        with self.session.request('REPORT', self.dav_url, data=body,
+                                  headers={'Depth': '0'}, stream=True) as response:
+            if response.status_code != 207:
+                # 403/409 with <d:valid-sync-token/> means the token is no longer valid
+                if not sync_token:
+                    print(f"Error syncing contacts: {response.status_code} - {response.text}", file=sys.stderr)
+                return None
+            response.raw.decode_content = True
+            etags, deleted, new_token = {}, [], sync_token
+            try:
+                for event, elem in ET.iterparse(response.raw):
+                    if elem.tag == NS_SYNC_TOKEN:
+                        new_token = (elem.text or "").strip()
+                    elif elem.tag == NS_RESPONSE:
+                        href = elem.findtext(NS_HREF)
+                        # Removed members carry a bare 404 status instead of a propstat
+                        if " 404 " in (elem.findtext(NS_STATUS) or ""):
+                            deleted.append(href)
+                        else:
+                            etag = elem.findtext(GETETAG_PATH)
+                            if etag and not href.endswith('/'):
+                                etags[href] = etag
+                        elem.clear()
+            except ET.ParseError as e:
+                print(f"Error parsing XML: {e}", file=sys.stderr)
+                return None
+        return etags, deleted, new_token
+
+    def get_contacts_by_hrefs(self, hrefs, props=None):
+        """
+        Fetches many cards in one addressbook-multiget REPORT instead of a GET
+        each. Returns parsed contacts (with 'etag'); hrefs the server doesn't
+        have are left out. props limits the vCard to those properties.
+        """
+        if not hrefs:
+            return []
+        if props:
+            address_data = "<c:address-data>" + "".join(f'<c:prop name="{p}"/>' for p in props) + "</c:address-data>"
+        else:
+            address_data = "<c:address-data />"
+        href_elems = "".join(f"<d:href>{xml_escape(href)}</d:href>" for href in hrefs)
+        body = f"""
+        <c:addressbook-multiget xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:carddav">
             <d:prop>
                 <d:getetag />
-                <c:address-data />
+                {address_data}
             </d:prop>
-        </d:propfind>
+            {href_elems}
+        </c:addressbook-multiget>
         """
-        response = self.session.request('PROPFIND', self.dav_url, data=body, headers={'Depth': '1'})
-        
-        if response.status_code == 207:
-            return self._parse_multistatus(response.text)
-        else:
-            print(f"Error fetching contacts: {response.status_code} - {response.text}", file=sys.stderr)
-            return []
+        return list(self._report_contacts(body.encode('utf-8'), "fetching contacts"))
+
+    def _load_cache(self):
+        """Reads the sync cache; returns {'sync_token', 'entries': {href: contact}}."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            # A cache written for another server or addressbook is useless here
+            if data.get('dav_url') == self.dav_url:
+                return {'sync_token': data.get('sync_token') or "",
+                        'entries': {e['href']: e for e in data.get('entries', [])}}
+        except (IOError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return {'sync_token': "", 'entries': {}}
+
+    def _save_cache(self, cache):
+        """Atomically writes the sync cache, readable only by the owner."""
+        tmp_path = f"{self.cache_file}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), mode=0o700, exist_ok=True)
+            fd = os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'dav_url': self.dav_url, 'sync_token': cache['sync_token'],
+                           'entries': list(cache['entries'].values())}, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Warning: could not write contact cache {self.cache_file}: {e}", file=sys.stderr)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
 
     def search_contacts(self, query):
-        """Searches contacts (client-side filter for simplicity)."""
-        all_contacts = self.list_contacts()
-        results = []
-        query_lower = query.lower()
-        for contact in all_contacts:
-            vcard = contact.get('vcard', '')
-            if query_lower in vcard.lower():
-                results.append(contact)
-        return results
+        """Searches contacts server-side via a CardDAV addressbook-query REPORT."""
+        body = self._SEARCH_BODY_TEMPLATE.format(query=xml_escape(query)).encode('utf-8')
+        return list(self._report_contacts(body, "searching contacts"))
 
     def _validate_inputs(self, email=None, tel=None):
         """Validates that email and tel fields contain single, valid entries."""
@@ -113,25 +381,31 @@ class NextcloudContactManager:
     def create_contact(self, fn, email=None, tel=None, categories=None, address=None, url=None, note=None, org=None, title=None):
         """Creates a new contact using a VCard 3.0 template."""
         uid = str(uuid.uuid4())
-        vcard_data = defaultdict(list)
-        vcard_data['VERSION'].append("3.0")
-        vcard_data['FN'].append(fn)
-        vcard_data['N'].append(f"{fn};;;;")
-        vcard_data['UID'].append(uid)
-        
-        if email: vcard_data['EMAIL;TYPE=WORK'].append(email)
-        if tel: vcard_data['TEL;TYPE=CELL'].append(tel)
-        if categories: vcard_data['CATEGORIES'].append(categories)
-        if address: vcard_data['ADR;TYPE=HOME'].append(f";;{address};;;;")
-        if url: vcard_data['URL'].append(url)
-        if note: vcard_data['NOTE'].append(note)
-        if org: vcard_data['ORG'].append(org)
-        if title: vcard_data['TITLE'].append(title)
-
-        vcard_str = self._construct_vcard(vcard_data)
+        fields = (
+            ('FN', fn),
+            ('N', f"{fn};;;;"),
+            ('UID', uid),
+            ('EMAIL;TYPE=WORK', email),
+            ('TEL;TYPE=CELL', tel),
+            ('CATEGORIES', categories),
+            ('ADR;TYPE=HOME', f";;{address};;;;" if address else None),
+            ('URL', url),
+            ('NOTE', note),
+            ('ORG', org),
+            ('TITLE', title),
+        )
+
+        # Write each line straight into one buffer, no intermediate list/join
+        buf = io.StringIO()
+        buf.write("BEGIN:VCARD\r\nVERSION:3.0\r\n")
+        buf.writelines(
+            self._fold_vcard_line(f"{key}:{self._escape_property(key.partition(';')[0], value)}") + "\r\n"
+            for key, value in fields if value
+        )
+        buf.write("END:VCARD")
         resource_url = f"{self.dav_url}{uid}.vcf"
         
-        response = self.session.put(resource_url, data=vcard_str, headers={'Content-Type': 'text/vcard; charset=utf-8'})
+        response = self.session.put(resource_url, data=buf.getvalue().encode('utf-8'), headers={'Content-Type': 'text/vcard; charset=utf-8'})
         
         if response.status_code in [201, 204]:
             print(f"Successfully created contact: {fn} (UID: {uid})")
@@ -142,27 +416,36 @@ class NextcloudContactManager:
 
     def get_contact_href_by_uid(self, uid):
         """Finds the HREF for a contact given its UID."""
-        contacts = self.list_contacts()
-        for contact in contacts:
+        # Stops reading an uncached listing as soon as the UID turns up
+        for contact in self.current_contacts():
             if contact['uid'] == uid:
                 return contact['href']
         return None
 
-    def update_contact(self, uid, fn=None, email=None, tel=None, categories=None, address=None, url=None, note=None, vcard_file=None, org=None, title=None):
+    def current_contacts(self):
+        """Up-to-date contacts: the synced cache if enabled, else a live listing."""
+        return self.sync_contacts() if self.cache_file else self.list_contacts()
+
+    def _href_to_url(self, href):
+        """Turns a server-relative href into an absolute URL."""
+        from urllib.parse import urlparse
+        parsed_base = urlparse(self.base_url)
+        return f"{parsed_base.scheme}://{parsed_base.netloc}{href}"
+
+    def update_contact(self, uid, fn=None, email=None, tel=None, categories=None, address=None, url=None, note=None, vcard_file=None, org=None, title=None, href=None, card=None):
         """
         Updates an existing contact. Fetches current VCard, parses to list, appends new values,
-        or updates from a raw VCard file.
+        or updates from a raw VCard file. Pass href to skip the UID lookup, and card
+        (vCard text, etag) to skip the initial fetch when it was already multiget.
         """
         if not self._validate_inputs(email, tel):
             return False
-        href = self.get_contact_href_by_uid(uid)
+        href = href or self.get_contact_href_by_uid(uid)
         if not href:
             print(f"Error: Contact with UID {uid} not found.")
             return False
-            
-        from urllib.parse import urlparse
-        parsed_base = urlparse(self.base_url)
-        vcf_url = f"{parsed_base.scheme}://{parsed_base.netloc}{href}"
+
+        vcf_url = self._href_to_url(href)
 
         if vcard_file:
             try:
@@ -173,43 +456,49 @@ class NextcloudContactManager:
                 print(f"Error reading VCard file: {e}", file=sys.stderr)
                 return False
         else:
-            # 1. Fetch existing VCard
-            response = self.session.get(vcf_url)
-            if response.status_code != 200:
-                print(f"Error fetching existing contact {uid}: {response.status_code}")
-                return False
-                
-            # 2. Parse into Multi-Value Dict
-            vcard_data = self._parse_vcard_lines(response.text)
-
-            # 3. Update fields (Append if not exists, replace if single-value like FN)
-            if fn: 
-                vcard_data['FN'] = [fn] # Replace Name
-                # Optional: Update N field smarter? Keeping it simple.
-
-            if email: self._append_if_missing(vcard_data, 'EMAIL;TYPE=INTERNET', email)
-            if tel: self._append_if_missing(vcard_data, 'TEL;TYPE=HOME', tel)
-            if categories: self._append_if_missing(vcard_data, 'CATEGORIES', categories)
-            if url: self._append_if_missing(vcard_data, 'URL', url)
-            if note: self._append_if_missing(vcard_data, 'NOTE', note)
-            if org: vcard_data['ORG'] = [org]
-            if title: vcard_data['TITLE'] = [title]
-            
-            if address:
-                # Check if this address string is already in any ADR field
-                # ADR format in vcard_data list is full string (e.g. ";;Street;;;;")
-                # We want to match loosely on the street part
-                exists = False
-                for adr_line in vcard_data.get('ADR;TYPE=HOME', []) + vcard_data.get('ADR', []):
-                    if address in adr_line:
-                        exists = True
-                        break
-                if not exists:
-                    vcard_data['ADR;TYPE=HOME'].append(f";;{address};;;;")
-
-            # 4. Construct and Upload
-            vcard_str = self._construct_vcard(vcard_data)
-            response = self.session.put(vcf_url, data=vcard_str.encode('utf-8'))
+            for attempt in range(UPDATE_ATTEMPTS):
+                # 1. Fetch existing VCard (a 412 retry always re-fetches)
+                if card and attempt == 0:
+                    vcard_text, etag = card
+                else:
+                    response = self.session.get(vcf_url)
+                    if response.status_code != 200:
+                        print(f"Error fetching existing contact {uid}: {response.status_code}")
+                        return False
+                    vcard_text, etag = response.text, response.headers.get('ETag')
+
+                # 2. Tokenize once into ordered [name, params, value] entries
+                props = self._parse_vcard(vcard_text)
+
+                # 3. Update fields (Append if not exists, replace if single-value like FN)
+                if fn:
+                    self._set_property(props, 'FN', fn) # Replace Name
+                    # Optional: Update N field smarter? Keeping it simple.
+
+                if email: self._add_property(props, 'EMAIL', ';TYPE=INTERNET', email)
+                if tel: self._add_property(props, 'TEL', ';TYPE=HOME', tel)
+                if categories: self._add_property(props, 'CATEGORIES', '', categories)
+                if url: self._add_property(props, 'URL', '', url)
+                if note: self._add_property(props, 'NOTE', '', note)
+                if org: self._set_property(props, 'ORG', org)
+                if title: self._set_property(props, 'TITLE', title)
+
+                if address:
+                    # Check if this address string is already in any ADR field
+                    # ADR values are full strings (e.g. ";;Street;;;;")
+                    # We want to match loosely on the street part
+                    if not any(address in adr for adr in self._property_values(props, 'ADR')):
+                        self._append_property(props, 'ADR', ';TYPE=HOME', f";;{address};;;;")
+
+                # 4. Re-emit and Upload
+                vcard_str = self._emit_vcard(props)
+                headers = {'Content-Type': 'text/vcard; charset=utf-8'}
+                if etag:
+                    # Only overwrite the version we read; 412 means someone else changed it
+                    headers['If-Match'] = etag
+                response = self.session.put(vcf_url, data=vcard_str.encode('utf-8'), headers=headers)
+                if response.status_code != 412:
+                    break
         
         if response.status_code in [200, 201, 204]:
             return True
@@ -217,18 +506,14 @@ class NextcloudContactManager:
             print(f"Error updating contact: {response.status_code} - {response.text}")
             return False
 
-    def delete_contact(self, uid):
-        """Deletes a contact by UID."""
-        href = self.get_contact_href_by_uid(uid)
+    def delete_contact(self, uid, href=None):
+        """Deletes a contact by UID. Pass href to skip the UID lookup."""
+        href = href or self.get_contact_href_by_uid(uid)
         if not href:
             print(f"Error: Contact with UID {uid} not found.")
             return False
 
-        from urllib.parse import urlparse
-        parsed_base = urlparse(self.base_url)
-        vcf_url = f"{parsed_base.scheme}://{parsed_base.netloc}{href}"
-
-        response = self.session.delete(vcf_url)
+        response = self.session.delete(self._href_to_url(href))
         
         if response.status_code in [200, 204]:
             print(f"Successfully deleted contact: {uid}")
@@ -237,6 +522,72 @@ class NextcloudContactManager:
             print(f"Error deleting contact: {response.status_code} - {response.text}", file=sys.stderr)
             return False
 
+    def _run_bulk(self, uids, action, fetch_cards=False):
+        """
+        Resolves every UID with a single listing, then runs action(uid, href, card)
+        concurrently over the shared session. With fetch_cards, card is the
+        (vCard text, etag) from one multiget of all targets, else None.
+        Returns {uid: success}.
+        """
+        hrefs = {c['uid']: c['href'] for c in self.current_contacts()}
+        cards = {}
+        if fetch_cards:
+            found = [hrefs[uid] for uid in uids if uid in hrefs]
+            cards = {c['href']: (c['vcard'], c['etag']) for c in self.get_contacts_by_hrefs(found)}
+
+        def run(uid):
+            href = hrefs.get(uid)
+            if not href:
+                print(f"Error: Contact with UID {uid} not found.")
+                return False
+            try:
+                return action(uid, href, cards.get(href))
+            except Exception as e:
+                # One bad contact (or connection) mustn't lose the other results
+                print(f"Error: Contact {uid} failed: {e}", file=sys.stderr)
+                return False
+
+        with ThreadPoolExecutor(max_workers=BULK_WORKERS) as pool:
+            return dict(zip(uids, pool.map(run, uids)))
+
+    def bulk_delete(self, uids):
+        """Deletes many contacts concurrently. Returns {uid: success}."""
+        return self._run_bulk(uids, lambda uid, href, card: self.delete_contact(uid, href=href))
+
+    def bulk_update(self, updates):
+        """
+        Applies many updates concurrently. Each update is a dict of
+        update_contact keyword arguments including 'uid'. Returns {uid: success}.
+        Raises ValueError, before any request is made, if an entry is malformed.
+        """
+        self._check_bulk_updates(updates)
+        by_uid = {u['uid']: u for u in updates}
+        return self._run_bulk(list(by_uid), lambda uid, href, card: self.update_contact(**by_uid[uid], href=href, card=card),
+                              fetch_cards=True)
+
+    @classmethod
+    def _check_bulk_updates(cls, updates):
+        if not isinstance(updates, list):
+            raise ValueError("expected a JSON list of objects")
+        problems = []
+        seen = set()
+        for i, entry in enumerate(updates):
+            if not isinstance(entry, dict):
+                problems.append(f"entry {i}: not an object")
+                continue
+            uid = entry.get("uid")
+            if not isinstance(uid, str) or not uid:
+                problems.append(f"entry {i}: missing \"uid\"")
+            elif uid in seen:
+                problems.append(f"entry {i}: duplicate uid {uid}")
+            else:
+                seen.add(uid)
+            unknown = sorted(set(entry) - cls._BULK_UPDATE_FIELDS - {"uid"})
+            if unknown:
+                problems.append(f"entry {i}: unsupported field(s) {', '.join(unknown)}")
+        if problems:
+            raise ValueError("; ".join(problems))
+
     def _unfold_vcard(self, vcard_text):
         # Unfold: Join lines that start with space or tab
         lines = vcard_text.splitlines()
@@ -265,127 +616,135 @@ class NextcloudContactManager:
         if not val: return ""
         return val.replace('\\n', '\n').replace('\\N', '\n').replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\')
 
-    def _parse_vcard_lines(self, vcard_text):
-        """Parses VCard text into a dict of lists."""
-        data = defaultdict(list)
-        unfolded = self._unfold_vcard(vcard_text)
-        for line in unfolded.splitlines():
+    def _parse_vcard(self, vcard_text):
+        """
+        Tokenizes a VCard into [name, params, value] entries in their original
+        order. params keeps its leading ';' and values stay escaped, so entries
+        that are not modified are written back exactly as they were.
+        """
+        props = []
+        for line in self._unfold_vcard(vcard_text).splitlines():
             line = line.strip()
             if not line or line in ["BEGIN:VCARD", "END:VCARD"]: continue
             if ":" in line:
                 key, value = line.split(":", 1)
-                data[key].append(self._unescape_vcard_value(value))
-        return data
+                name, sep, params = key.partition(";")
+                props.append([name, sep + params, value])
+        return props
 
-    def _construct_vcard(self, vcard_data):
-        """Rebuilds VCard string from dict of lists."""
+    def _emit_vcard(self, props):
+        """Rebuilds VCard text from _parse_vcard entries."""
         lines = ["BEGIN:VCARD"]
-        version = vcard_data.pop('VERSION', ['3.0'])
-        for ver in version:
-            lines.append(f"VERSION:{ver}")
-        
-        for key, values in vcard_data.items():
-            base_key = key.split(';')[0]
-            for val in values:
-                if base_key in ['N', 'ADR', 'ORG']:
-                    # Structured fields: escape components but keep semicolons
-                    parts = val.split(';')
-                    val_esc = ';'.join(self._escape_vcard_value(p) for p in parts)
-                elif base_key == 'CATEGORIES':
-                    # Multi-value field separated by comma
-                    parts = val.split(',')
-                    val_esc = ','.join(self._escape_vcard_value(p.strip()) for p in parts)
-                else:
-                    val_esc = self._escape_vcard_value(val)
-                line = f"{key}:{val_esc}"
-                lines.append(self._fold_vcard_line(line))
-        
+        lines.extend(self._fold_vcard_line(f"{name}{params}:{value}") for name, params, value in props)
         lines.append("END:VCARD")
         return "\r\n".join(lines)
 
-    def _append_if_missing(self, data, key, value):
-        """Appends value to data[key] if not already present."""
-        if value not in data[key]:
-            data[key].append(value)
+    def _property_name(self, name):
+        # Ignore any group prefix (item1.EMAIL -> EMAIL)
+        return name.rsplit('.', 1)[-1].upper()
 
-    def _parse_multistatus(self, xml_text):
-        """Parses the WebDAV MultiStatus XML response."""
-        contacts = []
+    def _property_values(self, props, name):
+        """Unescaped values of every `name` entry."""
+        return [self._unescape_vcard_value(value) for n, _, value in props if self._property_name(n) == name]
+
+    def _append_property(self, props, name, params, value):
+        props.append([name, params, self._escape_property(name, value)])
+
+    def _add_property(self, props, name, params, value):
+        """Appends a `name` entry unless one already has this value."""
+        if value not in self._property_values(props, name):
+            self._append_property(props, name, params, value)
+
+    def _set_property(self, props, name, value):
+        """Replaces all `name` entries with a single one (keeping the first one's params and position)."""
+        indexes = [i for i, (n, _, _) in enumerate(props) if self._property_name(n) == name]
+        if not indexes:
+            self._append_property(props, name, '', value)
+            return
+        props[indexes[0]][2] = self._escape_property(name, value)
+        for i in reversed(indexes[1:]):
+            del props[i]
+
+    def _escape_property(self, name, value):
+        """Escapes a raw value for the given property name."""
+        if name in ['N', 'ADR', 'ORG']:
+            # Structured fields: escape components but keep semicolons
+            return ';'.join(self._escape_vcard_value(p) for p in value.split(';'))
+        if name == 'CATEGORIES':
+            # Multi-value field separated by comma
+            return ','.join(self._escape_vcard_value(p.strip()) for p in value.split(','))
+        return self._escape_vcard_value(value)
+
+    def _parse_multistatus(self, source):
+        """Parses a WebDAV MultiStatus XML stream, yielding one contact per response."""
+        root = None
         try:
-            # Register namespaces to make finding elements easier
-            namespaces = {
-                'd': 'DAV:',
-                'c': 'urn:ietf:params:xml:ns:carddav'
-            }
-            root = ET.fromstring(xml_text)
-            
-            for response in root.findall('d:response', namespaces):
-                href = response.find('d:href', namespaces).text
-                propstat = response.find('d:propstat', namespaces)
-                if propstat:
-                    prop = propstat.find('d:prop', namespaces)
-                    if prop:
-                        address_data = prop.find('c:address-data', namespaces)
-                        if address_data is not None and address_data.text:
-                            # Extract simple fields for display
-                            vcard_text = address_data.text
-                            fn = self._extract_field(vcard_text, 'FN')
-                            # EMAIL, TEL, URL can be multiple
-                            emails = self._extract_fields(vcard_text, 'EMAIL')
-                            tels = self._extract_fields(vcard_text, 'TEL')
-                            urls = self._extract_fields(vcard_text, 'URL')
-                            categories = self._extract_field(vcard_text, 'CATEGORIES')
-                            note = self._extract_field(vcard_text, 'NOTE')
-                            org = self._extract_field(vcard_text, 'ORG')
-                            title = self._extract_field(vcard_text, 'TITLE')
-                            
-                            # Address usually one, but could be multiple.
-                            # For display summary, just take the first one or clean it up.
-                            address = self._extract_field(vcard_text, 'ADR')
-                            if address.startswith(";;"):
-                                parts = address.split(";")
-                                if len(parts) > 2:
-                                    address = parts[2]
-                            
-                            uid = self._extract_field(vcard_text, 'UID')
-                            
-                            contacts.append({
-                                'href': href,
-                                'fn': fn,
-                                'emails': emails,
-                                'tels': tels,
-                                'categories': categories,
-                                'address': address,
-                                'urls': urls,
-                                'note': note,
-                                'org': org,
-                                'title': title,
-                                'uid': uid,
-                                'vcard': vcard_text
-                            })
+            # Stream the document and drop each <d:response> once it has been
+            # read, so memory stays flat however large the addressbook is
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                if root is None:
+                    root = elem
+                if event != 'end' or elem.tag != NS_RESPONSE:
+                    continue
+                href = elem.findtext(NS_HREF)
+                address_data = elem.find(ADDRDATA_PATH)
+                if address_data is not None and address_data.text:
+                    contact = self._contact_from_vcard(href, address_data.text)
+                    contact['etag'] = elem.findtext(GETETAG_PATH)
+                    yield contact
+                root.clear()
         except Exception as e:
             print(f"Error parsing XML: {e}", file=sys.stderr)
-        
-        return contacts
-
-    def _extract_field(self, vcard, field_name):
-        """Simple text extraction for single-value VCard fields (first match)."""
-        for line in vcard.splitlines():
-            if line.startswith(field_name + ":") or line.startswith(field_name + ";"):
-                parts = line.split(':', 1)
-                if len(parts) > 1:
-                    return parts[1]
-        return ""
-
-    def _extract_fields(self, vcard, field_name):
-        """Extraction for multi-value VCard fields."""
-        values = []
-        for line in vcard.splitlines():
-            if line.startswith(field_name + ":") or line.startswith(field_name + ";"):
-                parts = line.split(':', 1)
-                if len(parts) > 1:
-                    values.append(parts[1])
-        return values
+
+    def _contact_from_vcard(self, href, vcard_text):
+        """Extracts the display fields from a vCard."""
+        fields = self._extract_fields(vcard_text)
+
+        def first(name):
+            values = fields.get(name)
+            return values[0] if values else ""
+
+        fn = first('FN')
+        # EMAIL, TEL, URL can be multiple
+        emails = fields.get('EMAIL', [])
+        tels = fields.get('TEL', [])
+        urls = fields.get('URL', [])
+        categories = first('CATEGORIES')
+        note = first('NOTE')
+        org = first('ORG')
+        title = first('TITLE')
+
+        # Address usually one, but could be multiple.
+        # For display summary, just take the first one or clean it up.
+        address = first('ADR')
+        if address.startswith(";;"):
+            parts = address.split(";")
+            if len(parts) > 2:
+                address = parts[2]
+
+        uid = first('UID')
+
+        return {
+            'href': href,
+            'fn': fn,
+            'emails': emails,
+            'tels': tels,
+            'categories': categories,
+            'address': address,
+            'urls': urls,
+            'note': note,
+            'org': org,
+            'title': title,
+            'uid': uid,
+            'vcard': vcard_text
+        }
+
+    def _extract_fields(self, vcard):
+        """Returns {field name: [values in order]} for the display fields."""
+        fields = defaultdict(list)
+        for match in self._FIELD_RE.finditer(vcard):
+            fields[match.group(1)].append(match.group(2))
+        return fields
 
 def get_password_from_tmp():
     """Attempts to retrieve the nextcloud_user_will_pass from a temporary file."""
@@ -449,10 +808,26 @@ def get_password_from_vault(ask_vault_pass=False):
         pass
     return None
 
-def main():
+def format_contact(c):
+    """One-line summary of a parsed contact for list/search output."""
+    cats = f" [Cats: {c['categories']}]" if c['categories'] else ""
+    addr = f" [Addr: {c['address']}]" if c['address'] else ""
+    urls = f" [URLs: {', '.join(c['urls'])}]" if c['urls'] else ""
+    note = f" [Note: {c['note']}]" if c['note'] else ""
+    org = f" [Org: {c['org']}]" if c.get('org') else ""
+    title = f" [Title: {c['title']}]" if c.get('title') else ""
+    # Join first email/tel for brevity if list
+    email_display = c['emails'][0] if c['emails'] else ""
+    tel_display = c['tels'][0] if c['tels'] else ""
+
+    return f"- {c['fn']} ({email_display}) [Tel: {tel_display}]{cats}{addr}{urls}{note}{org}{title} [UID: {c['uid']}] [HREF: {c['href']}]"
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Manage Nextcloud Contacts")
     parser.add_argument("--no-verify", action="store_false", dest="verify", help="Disable SSL certificate verification")
     parser.add_argument("--ask-vault-pass", action="store_true", help="Ask for vault password to retrieve Nextcloud password")
+    parser.add_argument("--no-daemon", action="store_true", help="Run locally even if a daemon socket exists")
+    parser.add_argument("--no-cache", action="store_true", help=f"Don't use or update the contact cache in {CACHE_DIR}")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
     # List
@@ -488,24 +863,62 @@ def main():
     update_parser.add_argument("--org", help="Organization")
     update_parser.add_argument("--title", help="Job Title")
 
+    # Bulk Update Command
+    bulk_update_parser = subparsers.add_parser("bulk-update", help="Update many contacts from a JSON file")
+    bulk_update_parser.add_argument("file", help='JSON list of objects like {"uid": "...", "email": "..."}')
+
     # Delete Command
-    delete_parser = subparsers.add_parser("delete", help="Delete a contact")
-    delete_parser.add_argument("uid", help="UID of the contact to delete")
+    delete_parser = subparsers.add_parser("delete", help="Delete one or more contacts")
+    delete_parser.add_argument("uids", nargs="+", metavar="uid", help="UID of a contact to delete")
+
+    # Daemon Command
+    daemon_parser = subparsers.add_parser("daemon", help="Serve commands over a Unix socket, keeping the session warm")
+    daemon_parser.add_argument("--socket", default=DAEMON_SOCKET, help=f"Socket path (default: {DAEMON_SOCKET})")
 
-    args = parser.parse_args()
+    return parser
 
+def _password_digest(password):
+    return hashlib.sha256(password.encode('utf-8')).hexdigest() if password else None
+
+def connection_settings(args):
+    """
+    The environment and global options a manager is built from. A daemon only
+    runs commands whose settings match its own; 'password' is the digest of
+    NEXTCLOUD_PASSWORD, or None when the password comes from the vault.
+    """
+    # SSL Verification: env var takes precedence if set, otherwise CLI flag
+    verify_env = os.getenv("NEXTCLOUD_VERIFY_SSL", "true").lower()
+    return {
+        "url": os.getenv("NEXTCLOUD_URL", DEFAULT_URL).rstrip('/'),
+        "user": os.getenv("NEXTCLOUD_USER", DEFAULT_USER),
+        "verify": args.verify if verify_env == "true" else False,
+        "cache": not args.no_cache,
+        "password": _password_digest(os.getenv("NEXTCLOUD_PASSWORD")),
+    }
+
+def _settings_match(daemon_settings, client_settings):
+    """True if a command with client_settings may run on the daemon's manager."""
+    if not isinstance(client_settings, dict):
+        return False
+    for key, value in daemon_settings.items():
+        if key == "password":
+            # A client without NEXTCLOUD_PASSWORD would read the same vault
+            if client_settings.get(key) not in (None, value):
+                return False
+        elif client_settings.get(key) != value:
+            return False
+    return True
+
+def build_manager(args):
+    """Resolves URL, credentials and SSL settings and returns a manager."""
     # Environment Setup
-    url = os.getenv("NEXTCLOUD_URL", DEFAULT_URL)
-    user = os.getenv("NEXTCLOUD_USER", DEFAULT_USER)
+    settings = connection_settings(args)
+    url, user, verify = settings["url"], settings["user"], settings["verify"]
     password = os.getenv("NEXTCLOUD_PASSWORD")
     
     if not password:
         password = get_password_from_vault(args.ask_vault_pass)
 
-    # SSL Verification: env var takes precedence if set, otherwise CLI flag
-    verify_env = os.getenv("NEXTCLOUD_VERIFY_SSL", "true").lower()
-    verify = args.verify if verify_env == "true" else False
-
     if not password:
         # Prompt or fail. For automation/CLI, failure is safer than hanging.
         print("Error: NEXTCLOUD_PASSWORD environment variable is not set.", file=sys.stderr)
@@ -516,40 +929,25 @@ def main():
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-    manager = NextcloudContactManager(url, user, password, verify=verify)
+    cache_dir = CACHE_DIR if settings["cache"] else None
+    return NextcloudContactManager(url, user, password, verify=verify, cache_dir=cache_dir)
 
+def run_command(manager, args, parser):
     if args.command == "list":
-        contacts = manager.list_contacts()
-        print(f"Found {len(contacts)} contacts:")
-        for c in contacts:
+        # Uncached, print while the response is still being parsed; only the count is kept
+        count = 0
+        for c in manager.current_contacts():
+            count += 1
             if c['fn']: # Filter out the addressbook root itself which sometimes appears
-                cats = f" [Cats: {c['categories']}]" if c['categories'] else ""
-                addr = f" [Addr: {c['address']}]" if c['address'] else ""
-                urls = f" [URLs: {', '.join(c['urls'])}]" if c['urls'] else ""
-                note = f" [Note: {c['note']}]" if c['note'] else ""
-                org = f" [Org: {c['org']}]" if c.get('org') else ""
-                title = f" [Title: {c['title']}]" if c.get('title') else ""
-                # Join first email/tel for brevity if list
-                email_display = c['emails'][0] if c['emails'] else ""
-                tel_display = c['tels'][0] if c['tels'] else ""
-                
-                print(f"- {c['fn']} ({email_display}) [Tel: {tel_display}]{cats}{addr}{urls}{note}{org}{title} [UID: {c['uid']}] [HREF: {c['href']}]")
+                print(format_contact(c))
+        print(f"Found {count} contacts.")
 
     elif args.command == "search":
         results = manager.search_contacts(args.query)
         print(f"Found {len(results)} matches:")
         for c in results:
-             if c['fn']:
-                cats = f" [Cats: {c['categories']}]" if c['categories'] else ""
-                addr = f" [Addr: {c['address']}]" if c['address'] else ""
-                urls = f" [URLs: {', '.join(c['urls'])}]" if c['urls'] else ""
-                note = f" [Note: {c['note']}]" if c['note'] else ""
-                org = f" [Org: {c['org']}]" if c.get('org') else ""
-                title = f" [Title: {c['title']}]" if c.get('title') else ""
-                email_display = c['emails'][0] if c['emails'] else ""
-                tel_display = c['tels'][0] if c['tels'] else ""
-
-                print(f"- {c['fn']} ({email_display}) [Tel: {tel_display}]{cats}{addr}{urls}{note}{org}{title} [UID: {c['uid']}] [HREF: {c['href']}]")
+            if c['fn']:
+                print(format_contact(c))
 
     elif args.command == "create":
         manager.create_contact(args.fn, args.email, args.tel, args.categories, args.address, args.url, args.note, args.org, args.title)
@@ -558,11 +956,203 @@ def main():
         if manager.update_contact(args.uid, args.fn, args.email, args.tel, args.categories, args.address, args.url, args.note, args.vcard_file, args.org, args.title):
             print(f"Successfully updated contact: {args.uid}")
 
+    elif args.command == "bulk-update":
+        try:
+            with open(args.file, 'r') as f:
+                updates = json.load(f)
+        except (IOError, ValueError) as e:
+            print(f"Error reading updates file: {e}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            results = manager.bulk_update(updates)
+        except ValueError as e:
+            print(f"Error in updates file: {e}", file=sys.stderr)
+            sys.exit(1)
+        for uid, ok in results.items():
+            if ok:
+                print(f"Successfully updated contact: {uid}")
+        if not all(results.values()):
+            sys.exit(1)
+
     elif args.command == "delete":
-        manager.delete_contact(args.uid)
+        if len(args.uids) == 1:
+            manager.delete_contact(args.uids[0])
+        else:
+            results = manager.bulk_delete(args.uids)
+            if not all(results.values()):
+                sys.exit(1)
 
     else:
         parser.print_help()
 
+def _claim_socket_path(socket_path):
+    """
+    Removes a stale socket left at socket_path by a daemon that was killed.
+    Raises RuntimeError if a daemon is still listening there, or if the path
+    is not a socket owned by us (the /tmp fallback is shared with other users).
+    """
+    import socket
+
+    try:
+        st = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise RuntimeError(f"{socket_path} exists and is not a socket owned by this user")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.remove(socket_path)
+    else:
+        raise RuntimeError(f"a daemon is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+def serve_daemon(manager, parser, settings, socket_path=None):
+    """
+    Runs commands sent over a Unix socket against one long-lived manager, so
+    its session keeps the TLS connection and auth between CLI invocations.
+    Each connection sends one JSON object {"argv": [...], "cwd": "...",
+    "settings": {...}} on a line and receives the command's output, then a NUL
+    byte and the exit status. Commands whose connection_settings differ from
+    the daemon's get no output and the status DAEMON_DECLINED instead.
+    """
+    import contextlib
+    import socket
+
+    socket_path = socket_path or DAEMON_SOCKET
+    # Compare clients against the password actually in use, wherever it came from
+    settings = dict(settings, password=_password_digest(manager.password))
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket is owner-only (0600)
+    try:
+        _claim_socket_path(socket_path)
+        server.bind(socket_path)
+    except (OSError, RuntimeError) as e:
+        server.close()
+        print(f"Error: cannot listen on {socket_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        os.umask(old_umask)
+    # Remembered so shutdown never removes a socket another daemon bound since
+    bound = os.lstat(socket_path)
+    server.listen(8)
+    print(f"manage_nextcloud_contacts daemon listening on {socket_path}", file=sys.stderr)
+
+    home = os.getcwd()
+    try:
+        while True:
+            conn, _ = server.accept()
+            try:
+                with conn, conn.makefile('rw', encoding='utf-8') as stream:
+                    status = 0
+                    with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream):
+                        try:
+                            request = json.loads(stream.readline())
+                            argv = request.get("argv") if isinstance(request, dict) else None
+                            if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                                raise ValueError("expected a JSON object with an 'argv' list")
+                            if not _settings_match(settings, request.get("settings")):
+                                # Another server/account/SSL/cache setup: the client runs it itself
+                                status = DAEMON_DECLINED
+                            else:
+                                # Relative paths (bulk-update FILE, --vcard-file) belong to the caller
+                                os.chdir(request.get("cwd") or home)
+                                args = parser.parse_args(argv)
+                                if args.command == "daemon":
+                                    print("Error: 'daemon' cannot be run through the daemon.")
+                                    status = 1
+                                else:
+                                    run_command(manager, args, parser)
+                        except SystemExit as e:
+                            # argparse usage errors and commands that exit non-zero
+                            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                        except Exception as e:
+                            print(f"Error: {e}")
+                            status = 1
+                        finally:
+                            os.chdir(home)
+                    stream.write(f"\0{status}")
+            except OSError:
+                # The client went away before reading its output (or was only
+                # checking whether a daemon is listening)
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            st = os.lstat(socket_path)
+            if (st.st_dev, st.st_ino) == (bound.st_dev, bound.st_ino):
+                os.remove(socket_path)
+        except OSError:
+            pass
+
+def proxy_to_daemon(argv, settings, socket_path=None):
+    """
+    Forwards argv to a running daemon and copies its output to stdout.
+    Returns the command's exit status, or None if no daemon is reachable or
+    it declined the command because its settings differ.
+    """
+    import socket
+
+    socket_path = socket_path or DAEMON_SOCKET
+    try:
+        st = os.lstat(socket_path)
+    except OSError:
+        return None
+    # The /tmp fallback path could have been created by another user, who
+    # would then receive our commands and contact data
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+    except OSError:
+        # No daemon, or a stale socket left behind by one that was killed
+        conn.close()
+        return None
+    with conn:
+        request = {"argv": argv, "cwd": os.getcwd(), "settings": settings}
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        conn.shutdown(socket.SHUT_WR)
+        out = sys.stdout.buffer
+        status = None
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            if status is None:
+                # Output is text, so the first NUL starts the exit status trailer
+                output, sep, rest = chunk.partition(b"\0")
+                out.write(output)
+                out.flush()
+                if sep:
+                    status = rest
+            else:
+                status += chunk
+    if not status:
+        return 1
+    status = int(status)
+    return None if status == DAEMON_DECLINED else status
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(argv)
+
+    if args.command == "daemon":
+        serve_daemon(build_manager(args), parser, connection_settings(args), args.socket)
+        return
+
+    # --ask-vault-pass asks for a prompt the daemon can't show, so run locally
+    if args.command and not args.no_daemon and not args.ask_vault_pass:
+        status = proxy_to_daemon(argv, connection_settings(args))
+        if status is not None:
+            sys.exit(status)
+
+    run_command(build_manager(args), args, parser)
+
 if __name__ == "__main__":
     main()
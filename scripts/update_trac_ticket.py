@@ -2,15 +2,18 @@
 """
 ================================================================================
 Filename:       update_trac_ticket.py
-Version:        1.7
+Version:        1.8
 Author:         Gemini CLI
-Last Modified:  2026-06-11
+Last Modified:  2026-10-16
 Context:        http://trac.home.arpa/ticket/3265
 WWOS:           http://wwos.home.arpa/index.php/Trac_Wiki_Formatter
 
 Purpose:
     A helper script to update Trac tickets via the XML-RPC API.
 
+    Update 1.8:
+    - TRAC_PASSWORD is resolved via scripts.lib.secret_cache (single-pass ~/.bashrc
+      regex, cached between runs) instead of a per-line scan.
     Update 1.7:
     - Fixed resolution handling to explicitly set status to closed and assign resolution when resolving tickets via XML-RPC.
     Update 1.6:
@@ -34,28 +37,12 @@ import sys
 # Ensure scripts/lib is in path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from lib.trac_formatter import markdown_to_moinmoin, sanitize_content
+from lib.secret_cache import resolve_secret
 
 # --- Configuration ---
 def get_trac_password():
-    """Gets the TRAC_PASSWORD, falling back to ~/.bashrc if not set in environment."""
-    password = os.getenv("TRAC_PASSWORD")
-    if password:
-        return password
-
-    bashrc_path = os.path.expanduser("~/.bashrc")
-    if os.path.exists(bashrc_path):
-        try:
-            with open(bashrc_path, "r") as f:
-                for line in f:
-                    if "export TRAC_PASSWORD=" in line:
-                        # Extract value: export TRAC_PASSWORD="value" or export TRAC_PASSWORD=value
-                        parts = line.split("=", 1)
-                        if len(parts) == 2:
-                            val = parts[1].strip().strip('"').strip("'")
-                            return val
-        except Exception:
-            pass
-    return None
+    """Gets the TRAC_PASSWORD from the environment, a cached copy, or ~/.bashrc."""
+    return resolve_secret("TRAC_PASSWORD")
 
 TRAC_USER = os.getenv("TRAC_USER", "will")
 TRAC_PASSWORD = get_trac_password()